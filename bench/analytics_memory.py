@@ -0,0 +1,107 @@
+"""
+Memory benchmark: legacy analytics_data layout vs the compact AnalyticsModel
+
+Replays the same synthetic post/comment stream into both layouts and reports
+tracemalloc-measured memory and build time as JSON.
+
+Usage:
+    python bench/analytics_memory.py --users 20000 --posts 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scraper  # noqa: E402
+
+def legacy_entry():
+    """The per-nickname dict used before AnalyticsModel"""
+    return {
+        'total_posts': 0,
+        'total_comments': 0,
+        'commented_on': set(),
+        'commenters': defaultdict(int),
+        'posts_links': [],
+        'gender': '',
+        'city': '',
+        'daily_activity': defaultdict(int)
+    }
+
+def make_events(users, posts, seed=42):
+    rng = random.Random(seed)
+    names = [f"user_{i:06d}" for i in range(users)]
+    # Skewed activity: a few heavy posters, many occasional commenters
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(users)]
+    start = datetime(2026, 10, 1)
+    events = []
+    for i in range(posts):
+        author = rng.choices(names, weights)[0]
+        commenters = rng.sample(names, rng.randint(0, 3))
+        seen_at = start + timedelta(minutes=rng.randint(0, 60 * 24 * 14))
+        events.append((author, "Male" if i % 2 else "Female", "Lahore", seen_at, commenters,
+                       f"{scraper.BASE}/comments/text/{10_000_000 + i}/"))
+    return events
+
+def build_legacy(events):
+    data = defaultdict(legacy_entry)
+    for author, gender, city, seen_at, commenters, link in events:
+        today = seen_at.strftime("%Y-%m-%d")
+        data[author]['total_posts'] += 1
+        data[author]['gender'] = gender
+        data[author]['city'] = city
+        data[author]['daily_activity'][today] += 1
+        for commenter in commenters:
+            data[author]['commenters'][commenter] += 1
+            data[commenter]['commented_on'].add(author)
+            data[commenter]['total_comments'] += 1
+        data[author]['posts_links'].append(link)
+    return data
+
+def build_compact(events):
+    model = scraper.AnalyticsModel()
+    for event in events:
+        model.record_post(*event)
+    return model
+
+def measure(builder, events):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = builder(events)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "build_seconds": round(elapsed, 4),
+        "retained_bytes": current,
+        "peak_bytes": peak,
+        "users": len(result),
+    }
+
+def run(users, posts):
+    events = make_events(users, posts)
+    legacy, legacy_report = measure(build_legacy, events)
+    del legacy
+    compact, compact_report = measure(build_compact, events)
+    del compact
+    return {
+        "benchmark": "analytics_memory",
+        "users": users,
+        "posts": posts,
+        "legacy": legacy_report,
+        "compact": compact_report,
+        "retained_ratio": round(legacy_report["retained_bytes"] / max(compact_report["retained_bytes"], 1), 2),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--posts", type=int, default=100000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.users, args.posts), indent=2))
@@ -0,0 +1,120 @@
+"""
+In-memory stand-in for the gspread Worksheet/Spreadsheet calls the scraper makes
+
+Keeps rows as lists of strings and counts API calls, so sink and sheet-reading
+code paths can be exercised offline.
+"""
+
+import re
+
+import gspread
+
+def parse_cell(label):
+    """'C12' -> (row 12, column 3)"""
+    match = re.match(r"([A-Z]+)(\d+)$", label)
+    col = 0
+    for ch in match.group(1):
+        col = col * 26 + ord(ch) - 64
+    return int(match.group(2)), col
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.sheets = {}
+
+    def worksheet(self, title):
+        if title not in self.sheets:
+            raise gspread.WorksheetNotFound(title)
+        return self.sheets[title]
+
+    def add_worksheet(self, title, rows=1000, cols=26):
+        if title in self.sheets:
+            raise gspread.exceptions.APIError.__new__(gspread.exceptions.APIError)
+        return FakeWorksheet(title, self)
+
+    def worksheets(self):
+        return list(self.sheets.values())
+
+class FakeWorksheet:
+    def __init__(self, title="Text-Post2", spreadsheet=None, rows=None):
+        self.title = title
+        self.rows = [list(row) for row in rows or []]
+        self.calls = 0
+        self.spreadsheet = spreadsheet or FakeSpreadsheet()
+        self.spreadsheet.sheets[title] = self
+
+    @property
+    def row_count(self):
+        return max(1000, len(self.rows))
+
+    def _call(self):
+        self.calls += 1
+
+    def row_values(self, index):
+        self._call()
+        return list(self.rows[index - 1]) if index <= len(self.rows) else []
+
+    def get_all_values(self):
+        self._call()
+        return [list(row) for row in self.rows]
+
+    def get_all_records(self):
+        self._call()
+        header = self.rows[0] if self.rows else []
+        return [dict(zip(header, row + [""] * (len(header) - len(row)))) for row in self.rows[1:]]
+
+    def get(self, range_name=None, **kwargs):
+        self._call()
+        if range_name and ":" not in range_name:
+            row, col = parse_cell(range_name)
+            if row <= len(self.rows) and col <= len(self.rows[row - 1]):
+                return [[self.rows[row - 1][col - 1]]]
+            return []
+        return [list(row) for row in self.rows]
+
+    def col_values(self, col):
+        self._call()
+        return [row[col - 1] for row in self.rows if len(row) >= col and row[col - 1] != ""]
+
+    def update_title(self, title):
+        self._call()
+        del self.spreadsheet.sheets[self.title]
+        self.title = title
+        self.spreadsheet.sheets[title] = self
+
+    def append_row(self, row, **kwargs):
+        self._call()
+        self.rows.append(list(row))
+
+    def append_rows(self, rows, **kwargs):
+        self._call()
+        self.rows.extend(list(row) for row in rows)
+
+    def insert_rows(self, rows, row=1, **kwargs):
+        self._call()
+        self.rows[row - 1:row - 1] = [list(r) for r in rows]
+
+    def insert_row(self, values, index=1, **kwargs):
+        self._call()
+        self.rows.insert(index - 1, list(values))
+
+    def update(self, range_name=None, values=None, **kwargs):
+        self._call()
+
+    def batch_update(self, data, **kwargs):
+        self._call()
+        for update in data:
+            start = update["range"].split(":")[0]
+            row, col = parse_cell(start)
+            for r, values in enumerate(update["values"], start=row):
+                while len(self.rows) < r:
+                    self.rows.append([])
+                cells = self.rows[r - 1]
+                cells.extend([""] * (col - 1 + len(values) - len(cells)))
+                cells[col - 1:col - 1 + len(values)] = values
+
+    def add_rows(self, count):
+        self._call()
+
+    def clear(self):
+        self._call()
+        self.rows = []
@@ -0,0 +1,173 @@
+"""
+Offline benchmark suite for the scraper's hot paths
+
+Uses the recorded fresh-list HTML in fixtures/ and an in-memory fake worksheet
+(bench/fake_sheets.py), so nothing touches damadam.pk or Google. Each case
+reports wall time, throughput and tracemalloc peak memory; the JSON output can
+be diffed between versions to catch regressions.
+
+Usage:
+    python bench/hot_paths.py --sheet-rows 10000 100000 --output bench_hot_paths.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCH_DIR)
+# Keep benchmark state away from the real .scraper_state
+os.environ.setdefault("STATE_DIR", tempfile.mkdtemp(prefix="dd-bench-"))
+
+import scraper  # noqa: E402
+from fake_sheets import FakeWorksheet  # noqa: E402
+from analytics_memory import make_events  # noqa: E402
+
+def fixture_page(page=1):
+    with open(os.path.join(ROOT_DIR, "fixtures", "fresh_list.html"), encoding="utf-8") as f:
+        html = f.read()
+    return html.replace("__PAGE__", str(page)).replace("__NEXT__", str(page + 1))
+
+def sheet_rows(count):
+    """A header plus `count` distinct post rows built from the fixture page"""
+    template = [[data.get(h, "") for h in scraper.HEADERS]
+                for data in scraper.extract_batch(fixture_page(), 1, {})]
+    text_col = scraper.HEADERS.index("D_TEXT-P")
+    link_col = scraper.HEADERS.index("N_POST-L")
+    rows = [list(scraper.HEADERS)]
+    for i in range(count):
+        row = list(template[i % len(template)])
+        row[text_col] = f"{row[text_col]} ~{i}"
+        row[link_col] = scraper.post_url(10_000_000 + i)  # post ID is the row key
+        rows.append(row)
+    return rows
+
+def measure(name, ops, fn, repeat=3, setup=None):
+    """Best-of-`repeat` timing, then one traced run for peak memory"""
+    timings = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        fn(state)
+        timings.append(time.perf_counter() - started)
+    state = setup() if setup else None
+    tracemalloc.start()
+    fn(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(timings)
+    return {
+        "case": name,
+        "ops": ops,
+        "seconds": round(best, 6),
+        "ops_per_sec": round(ops / best, 1) if best else None,
+        "peak_bytes": peak,
+    }
+
+def bench_extraction(pages):
+    html = fixture_page()
+    articles = scraper.find_articles(scraper.parse_html(html))
+    return [
+        measure("parse_html", pages, lambda _: [scraper.parse_html(html) for _ in range(pages)]),
+        measure("extract_post_data", pages * len(articles),
+                lambda _: [scraper.extract_post_data(a, 1, {}) for _ in range(pages) for a in articles]),
+        measure("extract_batch", pages, lambda _: [scraper.extract_batch(html, 1, {}) for _ in range(pages)]),
+    ]
+
+def bench_hashing(count):
+    texts = [row[scraper.HEADERS.index("D_TEXT-P")] + "  \n extra   spaces" for row in sheet_rows(count)[1:]]
+    return [
+        measure("clean_text", count, lambda _: [scraper.clean_text(t) for t in texts]),
+        measure("text_hash", count, lambda _: [scraper.text_hash(t) for t in texts]),
+    ]
+
+def bench_existing_posts(sizes):
+    results = []
+    for size in sizes:
+        worksheet = FakeWorksheet(rows=sheet_rows(size))
+        results.append(measure(f"get_existing_posts_sheets[{size}]", size,
+                               lambda _: scraper.get_existing_posts_sheets(worksheet), repeat=2))
+    return results
+
+def bench_sheet_writes(sizes, batch_size):
+    results = []
+    batch = scraper.extract_batch(fixture_page(), 1, {})
+    batch = [dict(batch[i % len(batch)], **{"D_TEXT-P": f"new post {i}",
+                                             "N_POST-L": scraper.post_url(20_000_000 + i)})
+             for i in range(batch_size)]
+    for size in sizes:
+        rows = sheet_rows(size)
+
+        def setup():
+            worksheet = FakeWorksheet(rows=rows)
+            store = scraper.PostStore(os.path.join(tempfile.mkdtemp(prefix="dd-bench-"), "posts.db"))
+            store.seed_from_sheet(worksheet)
+            return worksheet, store
+
+        def run(state):
+            worksheet, store = state
+            scraper.update_batch_in_sheets(worksheet, [dict(d) for d in batch], store)
+            store.close()
+
+        results.append(measure(f"update_batch_in_sheets[{size}]", batch_size, run, repeat=2, setup=setup))
+    return results
+
+def bench_analytics(users, posts):
+    model = scraper.AnalyticsModel()
+    for event in make_events(users, posts):
+        model.record_post(*event)
+    store = scraper.AnalyticsStore(os.path.join(tempfile.mkdtemp(prefix="dd-bench-"), "analytics.db"))
+    store.merge(model)
+    try:
+        graph = scraper.InteractionGraph.from_store(store)
+        return [
+            measure(f"generate_analytics_data[{users}]", store.user_count(),
+                    lambda _: scraper.generate_analytics_data(store), repeat=2),
+            measure(f"interaction_graph_build[{users}]", graph.links.nnz,
+                    lambda _: scraper.InteractionGraph.from_store(store), repeat=2),
+            measure(f"interaction_graph_queries[{users}]", len(graph),
+                    lambda _: (graph.top_commenters(scraper.GRAPH_TOP_K), graph.mutual_pairs(),
+                               graph.reciprocity(), graph.degree_ranking()), repeat=2),
+        ]
+    finally:
+        store.close()
+
+def run(args):
+    results = []
+    results += bench_extraction(args.pages)
+    results += bench_hashing(args.hash_rows)
+    results += bench_existing_posts(args.sheet_rows)
+    results += bench_sheet_writes(args.sheet_rows, args.batch_size)
+    results += bench_analytics(args.users, args.posts)
+    return {
+        "benchmark": "hot_paths",
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50, help="fixture pages to parse/extract")
+    parser.add_argument("--hash-rows", type=int, default=100000)
+    parser.add_argument("--sheet-rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=200, help="rows per update_batch_in_sheets call")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    # The scraper logs every article at INFO; keep benchmark output clean
+    logging.getLogger().setLevel(logging.WARNING)
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
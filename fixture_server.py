@@ -0,0 +1,139 @@
+"""
+Local stand-in for damadam.pk that serves the recorded HTML in fixtures/
+
+Usage:
+    python fixture_server.py --port 8765
+    DD_BASE_URL=http://127.0.0.1:8765 FETCH_MODE=http DD_USERNAME=x DD_PASSWORD=y python scraper.py
+"""
+
+import argparse
+import logging
+import os
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SESSION_COOKIE = "sessionid"
+
+logger = logging.getLogger(__name__)
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves login, fresh-list, post detail and profile pages; keep-alive so connection pooling is exercised"""
+    protocol_version = "HTTP/1.1"
+    server_version = "DamaDamFixture/1.0"
+
+    def log_message(self, fmt, *args):
+        logger.debug(fmt, *args)
+
+    def _send(self, status, body="", headers=None):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def _redirect(self, location, headers=None):
+        headers = dict(headers or {})
+        headers["Location"] = location
+        self._send(302, "", headers)
+
+    def _has_session(self):
+        cookies = self.headers.get("Cookie", "")
+        return any(part.strip().split("=", 1)[0] == SESSION_COOKIE
+                   and part.strip().split("=", 1)[-1] in self.server.sessions
+                   for part in cookies.split(";") if part.strip())
+
+    def do_GET(self):
+        self.server.count_request(self.path)
+        url = urlparse(self.path)
+        if url.path == "/login/":
+            self._send(200, load_fixture("login.html"))
+        elif url.path == "/text/fresh-list/":
+            page = parse_qs(url.query).get("page", ["1"])[0]
+            if not page.isdigit():
+                self._send(404, "Not found")
+                return
+            if self.server.require_login and not self._has_session():
+                self._redirect("/login/?next=" + self.path)
+                return
+            html = load_fixture("fresh_list.html")
+            html = html.replace("__PAGE__", page).replace("__NEXT__", str(int(page) + 1))
+            self._send(200, html)
+        elif url.path.startswith("/comments/text/") and url.path.count("/") == 4:
+            post_id = url.path.split("/")[3]
+            self._send(200, load_fixture("post_detail.html").replace("__POST__", post_id))
+        elif url.path.startswith("/users/") and url.path.count("/") == 3:
+            nickname = url.path.split("/")[2]
+            self._send(200, load_fixture("profile.html").replace("__NICK__", nickname))
+        elif url.path in ("/", ""):
+            account = '<a href="/logout/">LOGOUT</a>' if self._has_session() else '<a href="/login/">LOGIN</a>'
+            self._send(200, f"<html><body>home {account}</body></html>")
+        else:
+            self._send(404, "Not found")
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        self.server.count_request(self.path)
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if urlparse(self.path).path != "/login/":
+            self._send(404, "Not found")
+            return
+        if (form.get("csrfmiddlewaretoken", [""])[0] == "fixture-csrf-token"
+                and form.get("username", [""])[0] and form.get("password", [""])[0]):
+            token = uuid.uuid4().hex
+            self.server.sessions.add(token)
+            self._redirect("/", {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"})
+        else:
+            self._redirect("/login/?error=1")
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, require_login=False):
+        super().__init__(address, FixtureHandler)
+        self.require_login = require_login
+        self.sessions = set()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self, path):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_server(port=0, require_login=False):
+    """Start the stand-in server on a background thread and return it"""
+    server = FixtureServer(("127.0.0.1", port), require_login=require_login)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--require-login", action="store_true",
+                        help="redirect fresh-list pages to /login/ without a session cookie")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    server = FixtureServer(("127.0.0.1", args.port), require_login=args.require_login)
+    logger.info(f"Serving fixtures on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
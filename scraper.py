@@ -4,34 +4,66 @@ Optimized for headless operation with environment-based configuration
 """
 
 import os
+import sys
 import json
 import base64
+import argparse
+import signal
 import logging
 import time
 from datetime import datetime, timedelta
 import csv
+import io
+import gzip
 import re
 import hashlib
+import sqlite3
 import random
+import shutil
+import tempfile
+import asyncio
+import threading
+import queue
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from array import array
 from collections import defaultdict, Counter
+from urllib.parse import urlsplit, parse_qs
+from html.parser import HTMLParser
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, SessionNotCreatedException
 from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.driver_cache import DriverCacheManager
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 # Google Sheets imports
 import gspread
 from google.oauth2.service_account import Credentials
 
+# Saved session encryption
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# Interaction graph
+import numpy as np
+from scipy import sparse
+
 # ----------------- Configuration -----------------
-LOGIN_URL = "https://damadam.pk/login/"
-BASE = "https://damadam.pk"
-START_URL_TEMPLATE = "https://damadam.pk/text/fresh-list/?page={page}"
+# DD_BASE_URL can point at a local stand-in server (see fixture_server.py)
+BASE = os.getenv("DD_BASE_URL", "https://damadam.pk").rstrip("/")
+LOGIN_URL = f"{BASE}/login/"
+START_URL_TEMPLATE = BASE + "/text/fresh-list/?page={page}"
+USER_AGENT = "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36"
 
 # Environment variables (GitHub Secrets)
 USERNAME = os.getenv("DD_USERNAME")
@@ -43,16 +75,147 @@ SERVICE_JSON_B64 = os.getenv("SERVICE_JSON")
 MAX_PAGES = int(os.getenv("MAX_PAGES", "50"))
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "20"))
 PAGE_TIMEOUT = int(os.getenv("PAGE_TIMEOUT", "8"))
-MIN_DELAY = float(os.getenv("MIN_DELAY", "2.2"))
-MAX_DELAY = float(os.getenv("MAX_DELAY", "3.6"))
+
+# Selenium readiness: driver.get returns per the load strategy ("eager" = DOMContentLoaded,
+# "none" = immediately); the page counts as ready once the article count holds steady
+PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "eager").strip().lower()
+READY_STABLE_SECONDS = float(os.getenv("READY_STABLE_SECONDS", "0.3"))
+READY_POLL_SECONDS = float(os.getenv("READY_POLL_SECONDS", "0.1"))
+
+# Network-level request blocking through DevTools (comma-separated patterns, first match
+# wins: deny list, then allow list, then everything off-site when BLOCK_THIRD_PARTY is set)
+BLOCK_REQUESTS = os.getenv("BLOCK_REQUESTS", "1").strip().lower() in ("1", "true", "yes")
+BLOCK_URL_PATTERNS = [p.strip() for p in os.getenv("BLOCK_URL_PATTERNS", ",".join([
+    "*://*/*.png*", "*://*/*.jpg*", "*://*/*.jpeg*", "*://*/*.gif*", "*://*/*.webp*", "*://*/*.svg*",
+    "*://*/*.ico*", "*://*/*.css*", "*://*/*.woff*", "*://*/*.ttf*", "*://*/*.otf*", "*://*/*.mp4*",
+    "*://*.doubleclick.net/*", "*://*.googlesyndication.com/*", "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*", "*://*.facebook.net/*", "*://*.facebook.com/*",
+])).split(",") if p.strip()]
+ALLOW_URL_PATTERNS = [p.strip() for p in os.getenv("ALLOW_URL_PATTERNS", "").split(",") if p.strip()]
+BLOCK_THIRD_PARTY = os.getenv("BLOCK_THIRD_PARTY", "1").strip().lower() in ("1", "true", "yes")
+# Per-page request/blocked/transfer counts from Chrome's performance log
+NETWORK_STATS = os.getenv("NETWORK_STATS", "1").strip().lower() in ("1", "true", "yes")
+
+# Fetch backend: "selenium" (headless Chrome) or "http" (pooled requests session)
+FETCH_MODE = os.getenv("FETCH_MODE", "selenium").strip().lower()
+# Minimum keep-alive pool size; raised to cover every thread that shares the session
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "4"))
+
+# Deprecated fixed per-page delay range (seconds). When set, it supplies the scheduler defaults
+# below: one request per MIN_DELAY seconds, no burst, MAX_DELAY - MIN_DELAY of jitter
+MIN_DELAY = float(os.getenv("MIN_DELAY")) if os.getenv("MIN_DELAY") else None
+MAX_DELAY = float(os.getenv("MAX_DELAY")) if os.getenv("MAX_DELAY") else None
+LEGACY_DELAY = MIN_DELAY is not None or MAX_DELAY is not None
+if LEGACY_DELAY:
+    MIN_DELAY = MIN_DELAY if MIN_DELAY is not None else min(2.2, MAX_DELAY)
+    MAX_DELAY = MAX_DELAY if MAX_DELAY is not None else max(3.6, MIN_DELAY)
+
+# Fetch pipeline: in-flight page requests and per-host token bucket (requests/sec)
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "4"))
+REQUEST_RATE = float(os.getenv("REQUEST_RATE", str(1 / max(MIN_DELAY, 0.01)) if LEGACY_DELAY else "0.4"))
+REQUEST_BURST = int(os.getenv("REQUEST_BURST", "1" if LEGACY_DELAY else "2"))
+# Extra random delay (seconds) added before every navigation
+REQUEST_JITTER = float(os.getenv("REQUEST_JITTER", str(max(0.0, MAX_DELAY - MIN_DELAY)) if LEGACY_DELAY else "0.8"))
+
+# Sharded crawl: worker processes, each with its own fetcher (1 = single process)
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+# Sheets write-behind buffer: flush after N rows or T seconds, retry quota errors
+SHEETS_FLUSH_ROWS = int(os.getenv("SHEETS_FLUSH_ROWS", "200"))
+SHEETS_FLUSH_SECONDS = float(os.getenv("SHEETS_FLUSH_SECONDS", "60"))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "4"))
+# Sheet layout: "insert" (default) keeps inserting at row 2 of the main tab; "partitioned"
+# (opt-in) appends to dated tabs (Text-Post2-2026-10) with a newest-first view on the main
+# tab, renaming an existing main tab to Text-Post2-archive on first use
+SHEETS_LAYOUT = os.getenv("SHEETS_LAYOUT", "insert").strip().lower()
+PARTITION_FORMAT = os.getenv("PARTITION_FORMAT", "%Y-%m")
+PARTITION_MAX_ROWS = int(os.getenv("PARTITION_MAX_ROWS", "50000"))
+VIEW_PARTITIONS = int(os.getenv("VIEW_PARTITIONS", "2"))
+VIEW_ROWS = int(os.getenv("VIEW_ROWS", "1000"))
+# Rewrite reply/comment cells of already-stored posts when they change
+SHEETS_UPDATE_EXISTING = os.getenv("SHEETS_UPDATE_EXISTING", "1").strip().lower() in ("1", "true", "yes")
 
 # Sheet names
 WORKSHEET_NAME = "Text-Post2"
 PROFILES_SHEET = "Profiles"
 ANALYTICS_SHEET = "User-Analytics"
+COMMENTS_SHEET = "Comments"
+TOP_COMMENTERS_SHEET = "Top-Commenters"
+MUTUAL_PAIRS_SHEET = "Mutual-Pairs"
+USER_GRAPH_SHEET = "User-Graph"
+
+# Streaming backup: gzip CSV/NDJSON appended per page, partitioned by scrape date
+EXPORT_DIR = os.getenv("EXPORT_DIR", "backups")
+EXPORT_FORMATS = [f.strip().lower() for f in os.getenv("EXPORT_FORMATS", "csv,ndjson").split(",") if f.strip()]
+EXPORT_ROTATE_ROWS = int(os.getenv("EXPORT_ROTATE_ROWS", "50000"))
+# fsync policy: "page" (after every page), "close" (end of run only) or "none"
+EXPORT_FSYNC = os.getenv("EXPORT_FSYNC", "page").strip().lower()
+
+# Local state kept between runs (cached by the workflow)
+STATE_DIR = os.getenv("STATE_DIR", ".scraper_state")
+POSTS_DB = os.getenv("POSTS_DB", os.path.join(STATE_DIR, "posts.db"))
+# Daemon mode (--daemon): poll interval bounds (seconds), new posts wanted per poll,
+# and the health/status file refreshed every cycle
+DAEMON_MIN_INTERVAL = float(os.getenv("DAEMON_MIN_INTERVAL", "60"))
+DAEMON_MAX_INTERVAL = float(os.getenv("DAEMON_MAX_INTERVAL", "900"))
+DAEMON_TARGET_NEW = float(os.getenv("DAEMON_TARGET_NEW", "10"))
+DAEMON_STATUS_FILE = os.getenv("DAEMON_STATUS_FILE", os.path.join(STATE_DIR, "daemon_status.json"))
+# Checkpoint journal of completed pages; replayed by --resume after a crash
+JOURNAL_FILE = os.getenv("JOURNAL_FILE", os.path.join(STATE_DIR, "journal.jsonl"))
+ANALYTICS_DB = os.getenv("ANALYTICS_DB", os.path.join(STATE_DIR, "analytics.db"))
+PROFILES_DB = os.getenv("PROFILES_DB", os.path.join(STATE_DIR, "profiles.db"))
+
+# Run metrics: JSON run report (latest + history) and a Prometheus textfile
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(STATE_DIR, "metrics"))
+RUN_REPORT_FILE = os.getenv("RUN_REPORT_FILE", os.path.join(METRICS_DIR, "run_report.json"))
+RUN_HISTORY_FILE = os.getenv("RUN_HISTORY_FILE", os.path.join(METRICS_DIR, "run_history.jsonl"))
+PROM_FILE = os.getenv("PROM_FILE", os.path.join(METRICS_DIR, "dd_scraper.prom"))
+
+# Chrome startup: cached chromedriver, offline mode and a persistent browser profile
+DRIVER_CACHE_DIR = os.getenv("DRIVER_CACHE_DIR", os.path.join(STATE_DIR, "chromedriver"))
+DRIVER_CACHE_DAYS = float(os.getenv("DRIVER_CACHE_DAYS", "7"))
+DRIVER_OFFLINE = os.getenv("DRIVER_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", os.path.join(STATE_DIR, "chrome-profile"))
+
+# Saved login session, encrypted with a key derived from SESSION_SECRET (DD_PASSWORD if
+# unset) because STATE_DIR ends up in the Actions cache; validated with one request before reuse
+COOKIE_FILE = os.getenv("COOKIE_FILE", os.path.join(STATE_DIR, "session_cookies.enc"))
+SESSION_SECRET = os.getenv("SESSION_SECRET") or PASSWORD
+# Plaintext cookie file written by earlier versions; removed on sight
+LEGACY_COOKIE_FILE = os.path.join(STATE_DIR, "session_cookies.json")
+SESSION_CHECK_URL = os.getenv("SESSION_CHECK_URL", BASE + "/")
+
+# Profile cache: full Profiles re-read after the TTL, appended rows only in between
+PROFILE_CACHE_TTL_HOURS = float(os.getenv("PROFILE_CACHE_TTL_HOURS", "24"))
+# Background enrichment of nicknames missing from Profiles (0 disables). Profiles are fetched
+# over a separate HTTP session with its own rate (requests/sec), so they never wait on page
+# loads. Fetches still queued when the crawl ends are dropped and picked up by the next run
+PROFILE_ENRICH_LIMIT = int(os.getenv("PROFILE_ENRICH_LIMIT", "100"))
+PROFILE_WORKERS = int(os.getenv("PROFILE_WORKERS", "2"))
+PROFILE_RATE = float(os.getenv("PROFILE_RATE", "0.2"))
+PROFILE_SHEET_BATCH = int(os.getenv("PROFILE_SHEET_BATCH", "50"))
+PROFILE_RETRY_HOURS = float(os.getenv("PROFILE_RETRY_HOURS", "168"))
+
+# Interaction graph tabs rebuilt from the analytics history after each merge (top-k
+# commenters per author, mutual pairs, degree ranking); the daemon rebuilds at most
+# every GRAPH_REFRESH_MINUTES
+GRAPH_ANALYTICS = os.getenv("GRAPH_ANALYTICS", "1").strip().lower() in ("1", "true", "yes")
+GRAPH_TOP_K = int(os.getenv("GRAPH_TOP_K", "5"))
+GRAPH_MAX_ROWS = int(os.getenv("GRAPH_MAX_ROWS", "5000"))
+GRAPH_REFRESH_MINUTES = float(os.getenv("GRAPH_REFRESH_MINUTES", "60"))
 
-# CSV backup
-CSV_FILE = "posts_backup_new.csv"
+# Full comment threads for posts with more replies than the list shows (off by default);
+# cached by post ID and reply count, optionally appended to the Comments tab
+COMMENT_THREADS = os.getenv("COMMENT_THREADS", "").strip().lower() in ("1", "true", "yes")
+COMMENT_WORKERS = int(os.getenv("COMMENT_WORKERS", "2"))
+COMMENT_THREAD_LIMIT = int(os.getenv("COMMENT_THREAD_LIMIT", "100"))
+COMMENTS_DB = os.getenv("COMMENTS_DB", os.path.join(STATE_DIR, "comments.db"))
+COMMENTS_SINK = os.getenv("COMMENTS_SINK", "").strip().lower() in ("1", "true", "yes")
+
+# Incremental crawl: stop after N consecutive pages with only known posts
+STOP_AFTER_SEEN_PAGES = int(os.getenv("STOP_AFTER_SEEN_PAGES", "2"))
+FULL_CRAWL = os.getenv("FULL_CRAWL", "").strip().lower() in ("1", "true", "yes")
 
 # ----------------- Logging Setup -----------------
 logging.basicConfig(
@@ -61,6 +224,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def warn_legacy_settings():
+    """Point users of the old fixed delay at the scheduler settings it was mapped to"""
+    if LEGACY_DELAY:
+        logger.warning(f"MIN_DELAY/MAX_DELAY are deprecated and mapped to REQUEST_RATE={REQUEST_RATE:.3g}, "
+                       f"REQUEST_BURST={REQUEST_BURST}, REQUEST_JITTER={REQUEST_JITTER:.3g}; "
+                       f"set those instead")
+
 # ----------------- Headers Structure -----------------
 # >>> CHANGE: Added "SCRAPE_TIME" as the first column so every inserted row starts with scrape timestamp.
 HEADERS = [
@@ -85,7 +255,54 @@ HEADERS = [
     "R_IMAGE-L"      # Image source URL
 ]
 
+# Columns of an existing row that are refreshed in place when they change
+UPDATE_COLUMNS = ["H_REPLY", "I_R-ON", "J_COM1", "K_COM2", "L_COM3",
+                  "N_POST-L", "O_COM1-L", "P_COM2-L", "Q_COM3-L"]
+
+# Extra (non-sheet) row key carrying the commenter nicknames of an extracted post
+COMMENTERS_KEY = "_COMMENTERS"
+
 # ----------------- Statistics Tracking -----------------
+PHASES = ("page_load", "wait", "extract", "throttle", "sheets_read", "sheets_write", "profile_load",
+          "thread_load", "login")
+# Histogram upper bounds in seconds (an implicit +Inf bucket follows)
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class PhaseHistogram:
+    """Latency histogram for one phase: bucket counts, total and max"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(PHASE_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(PHASE_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(PHASE_BUCKETS)
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        self.buckets = [a + b for a, b in zip(self.buckets, other["buckets"])]
+        self.count += other["count"]
+        self.total += other["total"]
+        self.max = max(self.max, other["max"])
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 4),
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "max": round(self.max, 4),
+            "buckets": list(self.buckets),
+        }
+
 class ScrapingStats:
     def __init__(self):
         self.reset()
@@ -101,6 +318,14 @@ class ScrapingStats:
         self.analytics_users = 0
         self.errors = 0
         self.api_calls = 0
+        self.navigations = 0
+        self.throttle_seconds = 0.0
+        self.navigation_seconds = 0.0
+        self.driver_startup_seconds = None
+        self.first_page_seconds = None
+        self.phases = {phase: PhaseHistogram() for phase in PHASES}
+        self.pages = {}
+        self._lock = threading.Lock()
 
     def add_posts(self, new_count, updated_count):
         self.posts_new += new_count
@@ -113,6 +338,76 @@ class ScrapingStats:
     def api_call(self):
         self.api_calls += 1
 
+    def throttled(self, seconds):
+        with self._lock:
+            self.throttle_seconds += seconds
+            self.phases["throttle"].observe(seconds)
+
+    def navigated(self, seconds, phase="page_load"):
+        with self._lock:
+            self.navigations += 1
+            self.navigation_seconds += seconds
+            self.phases[phase].observe(seconds)
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            self.phases[phase].observe(seconds)
+
+    @contextmanager
+    def timed(self, phase):
+        """Time the enclosed block into a phase histogram"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.monotonic() - start)
+
+    def page_record(self, page, **counters):
+        """Attach per-page counters/timings (articles, posts, new, load, wait, extract...)"""
+        with self._lock:
+            self.pages.setdefault(page, {"page": page}).update(counters)
+
+    def snapshot(self):
+        """Counters a worker process reports back to the coordinator"""
+        return {
+            "errors": self.errors,
+            "api_calls": self.api_calls,
+            "navigations": self.navigations,
+            "throttle_seconds": self.throttle_seconds,
+            "navigation_seconds": self.navigation_seconds,
+            "driver_startup_seconds": self.driver_startup_seconds,
+            "phases": {phase: hist.to_dict() for phase, hist in self.phases.items()},
+            "pages": list(self.pages.values()),
+        }
+
+    def merge(self, snapshot):
+        """Fold a worker's counters into this (coordinator) instance"""
+        with self._lock:
+            self.errors += snapshot["errors"]
+            self.api_calls += snapshot["api_calls"]
+            self.navigations += snapshot["navigations"]
+            self.throttle_seconds += snapshot["throttle_seconds"]
+            self.navigation_seconds += snapshot["navigation_seconds"]
+            if snapshot["driver_startup_seconds"] is not None:
+                self.driver_startup_seconds = max(self.driver_startup_seconds or 0,
+                                                  snapshot["driver_startup_seconds"])
+            for phase, hist in snapshot["phases"].items():
+                self.phases[phase].merge(hist)
+            for record in snapshot["pages"]:
+                self.pages.setdefault(record["page"], {}).update(record)
+
+    def first_page(self):
+        """Record time-to-first-page (from session start) once"""
+        if self.first_page_seconds is None:
+            self.first_page_seconds = self.duration().total_seconds()
+
+    def throttle_share(self):
+        """Share of request time spent waiting on politeness delays (percent)"""
+        total = self.throttle_seconds + self.navigation_seconds
+        if total == 0:
+            return 0.0
+        return (self.throttle_seconds / total) * 100
+
     def duration(self):
         return datetime.now() - self.session_start_time
 
@@ -126,26 +421,271 @@ class ScrapingStats:
         mins = max(self.duration().total_seconds() / 60.0, 1e-9)
         return self.posts_scraped / mins
 
+    def report(self):
+        """Run report: totals, phase histograms and per-page counters"""
+        return {
+            "started": self.session_start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_seconds": round(self.duration().total_seconds(), 3),
+            "pages_crawled": self.total_pages,
+            "posts_new": self.posts_new,
+            "posts_updated": self.posts_updated,
+            "analytics_users": self.analytics_users,
+            "errors": self.errors,
+            "api_calls": self.api_calls,
+            "navigations": self.navigations,
+            "first_page_seconds": self.first_page_seconds,
+            "driver_startup_seconds": self.driver_startup_seconds,
+            "posts_per_min": round(self.posts_per_min(), 2),
+            "blocked_requests": sum(p.get("blocked", 0) for p in self.pages.values()),
+            "transferred_bytes": sum(p.get("transferred", 0) for p in self.pages.values()),
+            "bucket_bounds": list(PHASE_BUCKETS),
+            "phases": {phase: hist.to_dict() for phase, hist in self.phases.items()},
+            "pages": [self.pages[page] for page in sorted(self.pages)],
+        }
+
 stats = ScrapingStats()
 
-# Global analytics data
-analytics_data = defaultdict(lambda: {
-    'total_posts': 0,
-    'total_comments': 0,
-    'commented_on': set(),
-    'commenters': defaultdict(int),
-    'posts_links': [],
-    'gender': '',
-    'city': '',
-    'daily_activity': defaultdict(int)
-})
+def write_atomic(path, text):
+    """Replace a file's contents in one step (readers never see a partial file)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def prometheus_text(report):
+    """Render a run report in the Prometheus text exposition format"""
+    lines = [
+        "# HELP dd_scraper_phase_seconds Time spent per scraper phase in the last run",
+        "# TYPE dd_scraper_phase_seconds histogram",
+    ]
+    for phase, hist in report["phases"].items():
+        cumulative = 0
+        for bound, count in zip(list(report["bucket_bounds"]) + ["+Inf"], hist["buckets"]):
+            cumulative += count
+            lines.append(f'dd_scraper_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+        lines.append(f'dd_scraper_phase_seconds_sum{{phase="{phase}"}} {hist["total"]}')
+        lines.append(f'dd_scraper_phase_seconds_count{{phase="{phase}"}} {hist["count"]}')
+    gauges = [
+        ("duration_seconds", "Wall time of the last run"),
+        ("pages_crawled", "Fresh-list pages crawled in the last run"),
+        ("posts_new", "New posts written in the last run"),
+        ("errors", "Errors in the last run"),
+        ("api_calls", "Google Sheets API calls in the last run"),
+        ("navigations", "Site requests in the last run"),
+        ("blocked_requests", "Browser requests blocked at the network layer in the last run"),
+        ("transferred_bytes", "Bytes transferred by the browser for fresh-list pages in the last run"),
+    ]
+    for name, help_text in gauges:
+        lines.append(f"# HELP dd_scraper_{name} {help_text}")
+        lines.append(f"# TYPE dd_scraper_{name} gauge")
+        lines.append(f"dd_scraper_{name} {report[name]}")
+    lines.append("# HELP dd_scraper_last_run_timestamp_seconds Unix time the last run finished")
+    lines.append("# TYPE dd_scraper_last_run_timestamp_seconds gauge")
+    lines.append(f"dd_scraper_last_run_timestamp_seconds {int(time.time())}")
+    return "\n".join(lines) + "\n"
+
+def write_run_report():
+    """Export the run report as JSON (plus a history line) and a Prometheus textfile"""
+    try:
+        report = stats.report()
+        write_atomic(RUN_REPORT_FILE, json.dumps(report, indent=2))
+        summary = {k: v for k, v in report.items() if k not in ("pages", "bucket_bounds")}
+        summary["phases"] = {phase: {"count": h["count"], "total": h["total"], "max": h["max"]}
+                             for phase, h in report["phases"].items()}
+        with open(RUN_HISTORY_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+        write_atomic(PROM_FILE, prometheus_text(report))
+        logger.info(f"Run report written: {RUN_REPORT_FILE}, {PROM_FILE}")
+    except Exception as e:
+        logger.error(f"Run report export failed: {e}")
+
+# ----------------- Analytics Model -----------------
+RECENT_LINKS = 3
+
+class AnalyticsModel:
+    """Compact analytics for one run (merged into AnalyticsStore at the end)
+    
+    Nicknames are interned to integer IDs and every per-user field lives in
+    arrays indexed by ID, so a user seen only as a commenter costs one ID and a
+    few array slots. Daily/hourly activity and author->commenter interactions
+    are counted as they arrive in sparse counters keyed by an ID pair packed
+    into one int (high << 32 | low), so memory follows the number of distinct
+    pairs rather than the number of posts and comments. Each user keeps a capped list of its most recent post links.
+    """
+    __slots__ = ("ids", "names", "posts", "comments", "profile", "profile_codes", "profile_values",
+                 "link_slots", "daily", "hourly", "edges")
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.posts = array("I")
+        self.comments = array("I")
+        self.profile = array("I")
+        self.profile_codes = {("", ""): 0}
+        self.profile_values = [("", "")]
+        self.link_slots = []
+        self.daily = Counter()   # uid << 32 | day ordinal -> posts
+        self.hourly = Counter()  # uid << 32 | hour -> posts
+        self.edges = Counter()   # author uid << 32 | commenter uid -> comments
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, nickname):
+        uid = self.ids.get(nickname)
+        if uid is None:
+            uid = len(self.names)
+            nickname = sys.intern(nickname)
+            self.ids[nickname] = uid
+            self.names.append(nickname)
+            self.posts.append(0)
+            self.comments.append(0)
+            self.profile.append(0)
+            self.link_slots.extend((None,) * RECENT_LINKS)
+        return uid
+
+    def record_post(self, author, gender, city, seen_at, commenters, link):
+        uid = self.intern(author)
+        self.posts[uid] += 1
+        
+        code = self.profile_codes.get((gender, city))
+        if code is None:
+            code = self.profile_codes[(gender, city)] = len(self.profile_values)
+            self.profile_values.append((gender, city))
+        self.profile[uid] = code
+        
+        self.daily[uid << 32 | seen_at.toordinal()] += 1
+        self.hourly[uid << 32 | seen_at.hour] += 1
+        
+        self.record_comments(author, commenters)
+        
+        # Fresh list is newest first, so the first links recorded are the most recent
+        if link:
+            base = uid * RECENT_LINKS
+            for slot in range(base, base + RECENT_LINKS):
+                if self.link_slots[slot] is None:
+                    self.link_slots[slot] = link
+                    break
+
+    def record_comments(self, author, commenters):
+        """Count comments on a post by author (also used for comments found after the post was recorded)"""
+        uid = self.intern(author)
+        for commenter in commenters:
+            if commenter:
+                cid = self.intern(commenter)
+                self.comments[cid] += 1
+                self.edges[uid << 32 | cid] += 1
+
+    def iter_users(self):
+        """Yield one delta dict per active user (for merging into AnalyticsStore)"""
+        names = self.names
+        commenters_by_author = defaultdict(dict)
+        low = 0xFFFFFFFF
+        for key, count in self.edges.items():
+            commenters_by_author[key >> 32][names[key & low]] = count
+        daily_by_user = defaultdict(dict)
+        for key, count in self.daily.items():
+            daily_by_user[key >> 32][datetime.fromordinal(key & low).strftime("%Y-%m-%d")] = count
+        hourly_by_user = defaultdict(dict)
+        for key, count in self.hourly.items():
+            hourly_by_user[key >> 32][key & low] = count
+        
+        for uid, nickname in enumerate(names):
+            if self.posts[uid] == 0 and self.comments[uid] == 0:
+                continue
+            gender, city = self.profile_values[self.profile[uid]]
+            base = uid * RECENT_LINKS
+            yield {
+                'nickname': nickname,
+                'total_posts': self.posts[uid],
+                'total_comments': self.comments[uid],
+                'gender': gender,
+                'city': city,
+                'posts_links': [l for l in self.link_slots[base:base + RECENT_LINKS] if l],
+                'commenters': commenters_by_author.get(uid, {}),
+                'daily_activity': daily_by_user.get(uid, {}),
+                'hourly_activity': hourly_by_user.get(uid, {})
+            }
+
+# Global analytics data for the current run
+analytics_data = AnalyticsModel()
 
 # ----------------- Helper Functions -----------------
+def resolve_chromedriver(force_download=False):
+    """Path to chromedriver, resolved once and cached in DRIVER_CACHE_DIR
+    
+    DRIVER_OFFLINE never touches the network: it uses CHROMEDRIVER_PATH, the
+    cached driver (however old) or a chromedriver on PATH.
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+    
+    record_path = os.path.join(DRIVER_CACHE_DIR, "driver.json")
+    if not force_download:
+        try:
+            with open(record_path, encoding="utf-8") as f:
+                record = json.load(f)
+            age_days = (time.time() - record["resolved_at"]) / 86400
+            if os.access(record["path"], os.X_OK) and (DRIVER_OFFLINE or age_days < DRIVER_CACHE_DAYS):
+                logger.info(f"Using cached chromedriver: {record['path']}")
+                return record["path"]
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+    
+    if DRIVER_OFFLINE:
+        on_path = shutil.which("chromedriver")
+        if on_path:
+            logger.info(f"Offline mode: using chromedriver from PATH: {on_path}")
+            return on_path
+        raise RuntimeError("DRIVER_OFFLINE is set but no cached chromedriver was found")
+    
+    logger.info("Resolving chromedriver (version check / download)...")
+    os.makedirs(DRIVER_CACHE_DIR, exist_ok=True)
+    path = ChromeDriverManager(
+        cache_manager=DriverCacheManager(root_dir=DRIVER_CACHE_DIR, valid_range=int(DRIVER_CACHE_DAYS) or 1)
+    ).install()
+    with open(record_path, "w", encoding="utf-8") as f:
+        json.dump({"path": path, "resolved_at": time.time()}, f)
+    return path
+
+# Cookie stores inside a Chrome profile (the session is restored from COOKIE_FILE instead)
+PROFILE_COOKIE_FILES = ("Cookies", "Cookies-journal", os.path.join("Network", "Cookies"),
+                        os.path.join("Network", "Cookies-journal"))
+
+def prepare_profile_dir(path):
+    """Reuse a persistent Chrome profile; drop stale locks left by a previous host/run"""
+    os.makedirs(path, exist_ok=True)
+    for name in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+        lock = os.path.join(path, name)
+        if os.path.lexists(lock):
+            os.remove(lock)
+    return os.path.abspath(path)
+
+def purge_profile_cookies(path):
+    """Delete the cookie databases of every profile in a Chrome user-data dir
+    
+    The profile is cached with STATE_DIR, so it must not carry the live session.
+    """
+    if not path or not os.path.isdir(path):
+        return
+    for profile in os.listdir(path):
+        for name in PROFILE_COOKIE_FILES:
+            cookie_file = os.path.join(path, profile, name)
+            try:
+                os.remove(cookie_file)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Could not remove {cookie_file}: {e}")
+
 def setup_driver():
     """Setup Chrome driver optimized for GitHub Actions"""
     logger.info("Setting up Chrome WebDriver for headless operation...")
+    started = time.monotonic()
     
     options = webdriver.ChromeOptions()
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
     # GitHub Actions optimized options
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -154,25 +694,84 @@ def setup_driver():
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-extensions")
     options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")  # Speed up loading
+    # Images, fonts, CSS and third-party requests are blocked via DevTools (see block_requests)
     # NOTE: disabling JS can break site rendering; if you face empty pages, remove the next line
     options.add_argument("--disable-javascript")  # If not needed
     options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--user-agent=Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    if CHROME_PROFILE_DIR:
+        # Persistent, pre-warmed profile (HTTP cache, cookies) instead of a throwaway one
+        options.add_argument(f"--user-data-dir={prepare_profile_dir(CHROME_PROFILE_DIR)}")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
+    if NETWORK_STATS:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     
     try:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=options
-        )
-        logger.info("Chrome WebDriver initialized successfully")
+        try:
+            driver = webdriver.Chrome(service=Service(resolve_chromedriver()), options=options)
+        except SessionNotCreatedException as e:
+            # Usually a cached driver that no longer matches the installed Chrome
+            if DRIVER_OFFLINE or CHROMEDRIVER_PATH:
+                raise
+            logger.warning(f"Cached chromedriver rejected ({e.msg}), resolving again...")
+            driver = webdriver.Chrome(service=Service(resolve_chromedriver(force_download=True)),
+                                      options=options)
+        if BLOCK_REQUESTS:
+            block_requests(driver)
+        stats.driver_startup_seconds = time.monotonic() - started
+        logger.info(f"Chrome WebDriver initialized successfully in {stats.driver_startup_seconds:.1f}s")
         return driver
     except Exception as e:
         logger.error(f"Failed to setup WebDriver: {e}")
         raise
 
+def block_requests(driver, deny=BLOCK_URL_PATTERNS, allow=ALLOW_URL_PATTERNS, third_party=BLOCK_THIRD_PARTY):
+    """Block unneeded requests (images, fonts, CSS, trackers) at Chrome's network layer"""
+    host = urlsplit(BASE).hostname
+    patterns = [{"urlPattern": p, "block": True} for p in deny]
+    patterns += [{"urlPattern": p, "block": False} for p in allow]
+    if third_party and host:
+        patterns += [{"urlPattern": f"*://{host}/*", "block": False},
+                     {"urlPattern": f"*://*.{host}/*", "block": False},
+                     {"urlPattern": "*://*/*", "block": True}]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        try:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": patterns})
+            mode = "ordered allow/deny patterns"
+        except Exception:
+            # Older Chrome: wildcard deny list only (no allow list, no third-party catch-all)
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(deny)})
+            mode = "deny list only"
+        logger.info(f"Request blocking enabled: {len(deny)} deny, {len(allow)} allow patterns ({mode})")
+    except Exception as e:
+        logger.warning(f"Could not enable request blocking: {e}")
+
+def network_stats(driver):
+    """Drain Chrome's performance log: requests, blocked requests and bytes transferred"""
+    requests_seen = blocked = transferred = 0
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests_seen += 1
+        elif method == "Network.loadingFinished":
+            transferred += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+    return {"requests": requests_seen, "blocked": blocked, "transferred": transferred}
+
 def connect_google_sheet():
     """Connect to Google Sheets using environment variables"""
     try:
@@ -214,10 +813,6 @@ def connect_google_sheet():
         logger.error(f"Google Sheets setup failed: {e}")
         return None
 
-def human_delay():
-    """Random delay to mimic human behavior"""
-    time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-
 def clean_text(text):
     """Clean and normalize text"""
     if not text:
@@ -232,216 +827,782 @@ def text_hash(text):
         return ""
     return hashlib.md5(clean_text(text).encode()).hexdigest()[:12]
 
+# Real permalinks end in a slash; legacy rows linked /comments/text/<text hash> without
+# one, and a hash can be all digits, so the slash is required
+POST_ID_RE = re.compile(r"/comments/text/(\d+)/(?:[?#].*)?$")
+
+def post_id_from_url(url):
+    """Numeric DamaDam post ID from a /comments/text/<id>/ permalink, or ''"""
+    match = POST_ID_RE.search(url or "")
+    return match.group(1) if match else ""
+
+def post_url(post_id):
+    return f"{BASE}/comments/text/{post_id}/"
+
+def legacy_key(data):
+    """Pre-ID dedupe key (MD5 of the cleaned text), kept for migrating old rows"""
+    return text_hash(data.get("D_TEXT-P", ""))
+
+def post_key(data):
+    """Dedupe key for a post row: its post ID, or the legacy text hash if it has none"""
+    return post_id_from_url(data.get("N_POST-L", "")) or legacy_key(data)
+
 def to_abs_url(path):
     """Convert to absolute URL"""
     if not path or path.startswith("http"):
         return path
     return BASE + (path if path.startswith("/") else "/" + path)
 
-def export_csv(data, filename=CSV_FILE):
-    """Export data to CSV as backup"""
-    if not data:
-        logger.warning("No data to export to CSV")
-        return
+# ----------------- Profile and Analytics Functions -----------------
+def column_letter(index):
+    """1-based column index to A1 column letters"""
+    letters = ""
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+class ProfileCache:
+    """Local cache of the Profiles sheet plus profiles fetched from the site
     
-    try:
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=HEADERS)
-            writer.writeheader()
-            for row in data:
-                # Convert row list to dict using headers
-                if isinstance(row, list):
-                    row_dict = {HEADERS[i]: row[i] if i < len(row) else "" for i in range(len(HEADERS))}
-                    writer.writerow(row_dict)
-                else:
-                    writer.writerow(row)
-        logger.info(f"CSV backup saved: {filename}")
-    except Exception as e:
-        logger.error(f"CSV export failed: {e}")
+    Lookups behave like the old profiles dict: `nickname in cache` and
+    `cache[nickname]['gender']`. Nicknames whose profile page had no details are
+    remembered so they are not refetched until PROFILE_RETRY_HOURS have passed.
+    """
+
+    def __init__(self, path=PROFILES_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS profiles (
+                    nickname   TEXT PRIMARY KEY,
+                    gender     TEXT NOT NULL DEFAULT '',
+                    city       TEXT NOT NULL DEFAULT '',
+                    source     TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+        self.profiles = {}
+        self.missing = {}
+        for nickname, gender, city, source, fetched_at in self.conn.execute(
+                "SELECT nickname, gender, city, source, fetched_at FROM profiles"):
+            if source == "missing":
+                self.missing[nickname] = fetched_at
+            else:
+                self.profiles[nickname] = {'gender': gender, 'city': city}
+
+    def __contains__(self, nickname):
+        return nickname in self.profiles
+
+    def __getitem__(self, nickname):
+        return self.profiles[nickname]
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def _meta(self, key, default=None):
+        found = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(found[0]) if found else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def needs_fetch(self, nickname):
+        if nickname in self.profiles:
+            return False
+        checked = self.missing.get(nickname)
+        return checked is None or time.time() - checked > PROFILE_RETRY_HOURS * 3600
+
+    def put(self, nickname, gender, city, source):
+        """Store a profile; source is 'sheet', 'fetched' or 'missing'"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO profiles (nickname, gender, city, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (nickname, gender, city, source, time.time()))
+            if source == "missing":
+                self.missing[nickname] = time.time()
+            else:
+                self.missing.pop(nickname, None)
+                self.profiles[nickname] = {'gender': gender, 'city': city}
+
+    def _apply_sheet_rows(self, header, rows):
+        columns = {name.strip().upper(): i for i, name in enumerate(header)}
+        def cell(row, name):
+            i = columns.get(name)
+            return str(row[i]).strip() if i is not None and i < len(row) else ""
+        now = time.time()
+        updates = []
+        for row in rows:
+            nickname = cell(row, "NICKNAME")
+            if nickname:
+                updates.append((nickname, cell(row, "GENDER"), cell(row, "CITY"), "sheet", now))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO profiles (nickname, gender, city, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                updates)
+            for nickname, gender, city, _, _ in updates:
+                self.missing.pop(nickname, None)
+                self.profiles[nickname] = {'gender': gender, 'city': city}
+        return len(updates)
+
+    def sync(self, profiles_ws):
+        """Full re-read when the TTL has expired, otherwise read only appended rows"""
+        header = self._meta("header")
+        synced_rows = self._meta("synced_rows", 0)
+        last_full = self._meta("full_sync_at", 0)
+        
+        if header is None or time.time() - last_full > PROFILE_CACHE_TTL_HOURS * 3600:
+            values = sheets_call(profiles_ws.get_all_values)
+            if not values:
+                return
+            header, rows = values[0], values[1:]
+            count = self._apply_sheet_rows(header, rows)
+            with self.conn:
+                self._set_meta("header", header)
+                self._set_meta("synced_rows", len(values))
+                self._set_meta("full_sync_at", time.time())
+            logger.info(f"Profiles cache refreshed from sheet: {count} profiles")
+            return
+        
+        rows = sheets_call(profiles_ws.get, f"A{synced_rows + 1}:{column_letter(len(header))}")
+        if not rows:
+            logger.info("Profiles sheet unchanged since last sync")
+            return
+        count = self._apply_sheet_rows(header, rows)
+        with self.conn:
+            self._set_meta("synced_rows", synced_rows + len(rows))
+        logger.info(f"Profiles cache delta sync: {count} new profiles")
+
+    def note_appended(self, count):
+        """Rows we appended ourselves do not need to be read back"""
+        with self._lock, self.conn:
+            self._set_meta("synced_rows", self._meta("synced_rows", 0) + count)
+
+    def header(self):
+        return self._meta("header") or ["NICKNAME", "GENDER", "CITY"]
+
+    def close(self):
+        self.conn.close()
 
-# ----------------- Profile and Analytics Functions -----------------
 def load_profiles_data(worksheet=None):
-    """Load profiles data from Google Sheets"""
-    profiles = {}
+    """Open the local profile cache and sync it with the Profiles sheet"""
+    profiles = ProfileCache()
     if not worksheet:
         return profiles
     
-    logger.info("Loading user profiles from Google Sheets...")
+    logger.info("Loading user profiles...")
     
     try:
         sheet = worksheet.spreadsheet
         profiles_ws = sheet.worksheet(PROFILES_SHEET)
-        records = profiles_ws.get_all_records()
-        stats.api_call()
-        
-        for record in records:
-            nickname = record.get('NICKNAME', '').strip()
-            if nickname:
-                profiles[nickname] = {
-                    'gender': record.get('GENDER', '').strip(),
-                    'city': record.get('CITY', '').strip()
-                }
-        
-        stats.profiles_loaded = len(profiles)
-        logger.info(f"Loaded {len(profiles)} user profiles")
-        
+        profiles.sync(profiles_ws)
     except Exception as e:
-        logger.warning(f"Could not load profiles data: {e}")
+        logger.warning(f"Could not sync profiles data: {e}")
     
+    stats.profiles_loaded = len(profiles)
+    logger.info(f"Loaded {len(profiles)} user profiles")
     return profiles
 
-def generate_analytics_data():
-    """Generate analytics summary"""
+ANALYTICS_HEADERS = [
+    "NICKNAME", "TOTAL_POSTS", "TOTAL_COMMENTS", "MOST_ACTIVE_COMMENTER", 
+    "COMMENT_DIVERSITY", "GENDER", "CITY", "TODAY_ACTIVITY", "POST_LINKS"
+]
+
+def record_post_analytics(data, seen_at=None):
+    """Count a newly stored post (and its visible comments) in this run's analytics"""
+    author = data.get("B_NICKNAME", "")
+    if not author:
+        return
+    analytics_data.record_post(
+        author,
+        data.get("E_GENDER", ""),
+        data.get("F_CITY", ""),
+        seen_at or datetime.now(),
+        data.get(COMMENTERS_KEY, []),
+        data.get("N_POST-L", "")
+    )
+
+class AnalyticsStore:
+    """Per-user analytics persisted between runs and merged incrementally
+    
+    Each user keeps a fixed row in the analytics tab (sheet_row) so only the
+    users touched by a run have to be rewritten.
+    """
+
+    def __init__(self, path=ANALYTICS_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS users (
+                    nickname       TEXT PRIMARY KEY,
+                    total_posts    INTEGER NOT NULL DEFAULT 0,
+                    total_comments INTEGER NOT NULL DEFAULT 0,
+                    gender         TEXT NOT NULL DEFAULT '',
+                    city           TEXT NOT NULL DEFAULT '',
+                    post_links     TEXT NOT NULL DEFAULT '[]',
+                    sheet_row      INTEGER,
+                    sheet_day      TEXT
+                );
+                CREATE TABLE IF NOT EXISTS commenters (
+                    author    TEXT NOT NULL,
+                    commenter TEXT NOT NULL,
+                    count     INTEGER NOT NULL,
+                    PRIMARY KEY (author, commenter)
+                );
+                CREATE TABLE IF NOT EXISTS daily_activity (
+                    nickname TEXT NOT NULL,
+                    day      TEXT NOT NULL,
+                    count    INTEGER NOT NULL,
+                    PRIMARY KEY (nickname, day)
+                );
+                CREATE TABLE IF NOT EXISTS hourly_activity (
+                    nickname TEXT NOT NULL,
+                    hour     INTEGER NOT NULL,
+                    count    INTEGER NOT NULL,
+                    PRIMARY KEY (nickname, hour)
+                );
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(users)")]
+            if "sheet_day" not in columns:
+                # Day whose count the row's TODAY_ACTIVITY shows; assume the last active day
+                self.conn.execute("ALTER TABLE users ADD COLUMN sheet_day TEXT")
+                self.conn.execute("""
+                    UPDATE users SET sheet_day = (
+                        SELECT MAX(day) FROM daily_activity WHERE daily_activity.nickname = users.nickname)
+                    WHERE sheet_row IS NOT NULL
+                """)
+
+    def user_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def merge(self, run_data):
+        """Add one run's analytics delta; returns the set of touched nicknames"""
+        touched = set()
+        with self.conn:
+            for data in run_data.iter_users():
+                nickname = data['nickname']
+                touched.add(nickname)
+                found = self.conn.execute(
+                    "SELECT post_links FROM users WHERE nickname = ?", (nickname,)).fetchone()
+                old_links = json.loads(found[0]) if found else []
+                links = list(data['posts_links']) + old_links  # fresh list is newest first
+                self.conn.execute("""
+                    INSERT INTO users (nickname, total_posts, total_comments, gender, city, post_links)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(nickname) DO UPDATE SET
+                        total_posts = total_posts + excluded.total_posts,
+                        total_comments = total_comments + excluded.total_comments,
+                        gender = CASE WHEN excluded.gender != '' THEN excluded.gender ELSE gender END,
+                        city = CASE WHEN excluded.city != '' THEN excluded.city ELSE city END,
+                        post_links = excluded.post_links
+                """, (nickname, data['total_posts'], data['total_comments'],
+                      data['gender'], data['city'], json.dumps(links[:3])))
+                self.conn.executemany("""
+                    INSERT INTO commenters (author, commenter, count) VALUES (?, ?, ?)
+                    ON CONFLICT(author, commenter) DO UPDATE SET count = count + excluded.count
+                """, [(nickname, c, n) for c, n in data['commenters'].items()])
+                self.conn.executemany("""
+                    INSERT INTO daily_activity (nickname, day, count) VALUES (?, ?, ?)
+                    ON CONFLICT(nickname, day) DO UPDATE SET count = count + excluded.count
+                """, [(nickname, d, n) for d, n in data['daily_activity'].items()])
+                self.conn.executemany("""
+                    INSERT INTO hourly_activity (nickname, hour, count) VALUES (?, ?, ?)
+                    ON CONFLICT(nickname, hour) DO UPDATE SET count = count + excluded.count
+                """, [(nickname, h, n) for h, n in data['hourly_activity'].items()])
+        return touched
+
+    def assign_rows(self, nicknames):
+        """Sheet row for each nickname, giving new users the next free rows (most active first)"""
+        rows = {}
+        new_users = []
+        # A list keeps the caller's order for ties (generate_analytics_data's ranking)
+        ordered = nicknames if isinstance(nicknames, list) else sorted(nicknames)
+        with self.conn:
+            next_row = (self.conn.execute("SELECT MAX(sheet_row) FROM users").fetchone()[0] or 1) + 1
+            for nickname in ordered:
+                found = self.conn.execute(
+                    "SELECT sheet_row, total_posts + total_comments FROM users WHERE nickname = ?",
+                    (nickname,)).fetchone()
+                if found is None:
+                    continue
+                if found[0] is None:
+                    new_users.append((found[1], nickname))
+                else:
+                    rows[nickname] = found[0]
+            new_users.sort(key=lambda user: -user[0])
+            for _, nickname in new_users:
+                self.conn.execute("UPDATE users SET sheet_row = ? WHERE nickname = ?", (next_row, nickname))
+                rows[nickname] = next_row
+                next_row += 1
+        return rows
+
+    def has_sheet_rows(self):
+        return self.conn.execute(
+            "SELECT 1 FROM users WHERE sheet_row IS NOT NULL LIMIT 1").fetchone() is not None
+
+    def clear_sheet_rows(self):
+        with self.conn:
+            self.conn.execute("UPDATE users SET sheet_row = NULL, sheet_day = NULL")
+
+    def stale_today_rows(self, today):
+        """Users whose sheet row still shows TODAY_ACTIVITY from an earlier day"""
+        return {row[0] for row in self.conn.execute(
+            "SELECT nickname FROM users WHERE sheet_row IS NOT NULL AND sheet_day IS NOT NULL AND sheet_day != ?",
+            (today,))}
+
+    def note_today_written(self, values, today):
+        """Remember which rows now show a non-zero TODAY_ACTIVITY for today"""
+        column = ANALYTICS_HEADERS.index("TODAY_ACTIVITY")
+        with self.conn:
+            self.conn.executemany("UPDATE users SET sheet_day = ? WHERE nickname = ?",
+                                  [(today if row[column] else None, row[0]) for row in values])
+
+    def user_row(self, nickname, today):
+        """Analytics tab values for one user, in ANALYTICS_HEADERS order"""
+        found = self.conn.execute(
+            "SELECT total_posts, total_comments, gender, city, post_links FROM users WHERE nickname = ?",
+            (nickname,)).fetchone()
+        if found is None:
+            return None
+        total_posts, total_comments, gender, city, post_links = found
+        top = self.conn.execute(
+            "SELECT commenter FROM commenters WHERE author = ? ORDER BY count DESC, commenter LIMIT 1",
+            (nickname,)).fetchone()
+        diversity = self.conn.execute(
+            "SELECT COUNT(*) FROM commenters WHERE author = ?", (nickname,)).fetchone()[0]
+        today_row = self.conn.execute(
+            "SELECT count FROM daily_activity WHERE nickname = ? AND day = ?", (nickname, today)).fetchone()
+        return [
+            nickname,
+            total_posts,
+            total_comments,
+            top[0] if top else "",
+            diversity,
+            gender,
+            city,
+            today_row[0] if today_row else 0,
+            " | ".join(json.loads(post_links))
+        ]
+
+    def close(self):
+        self.conn.close()
+
+def generate_analytics_data(analytics_store, nicknames=None):
+    """Generate analytics summary rows (header first) from the persisted state
+    
+    With nicknames=None every user is included, sorted by total activity.
+    """
     today = datetime.now().strftime("%Y-%m-%d")
-    analytics_summary = []
+    analytics_summary = [ANALYTICS_HEADERS]
     
-    # Headers for analytics sheet
-    analytics_headers = [
-        "NICKNAME", "TOTAL_POSTS", "TOTAL_COMMENTS", "MOST_ACTIVE_COMMENTER", 
-        "COMMENT_DIVERSITY", "GENDER", "CITY", "TODAY_ACTIVITY", "POST_LINKS"
-    ]
-    analytics_summary.append(analytics_headers)
-    
-    # Sort users by total activity
-    sorted_users = sorted(analytics_data.items(), 
-                         key=lambda x: x[1]['total_posts'] + x[1]['total_comments'], 
-                         reverse=True)
-    
-    for nickname, data in sorted_users:
-        if data['total_posts'] > 0 or data['total_comments'] > 0:
-            # Find most active commenter
-            most_active_commenter = ""
-            if data['commenters']:
-                most_active_commenter = max(data['commenters'].items(), key=lambda x: x[1])[0]
-            
-            comment_diversity = len(data['commenters'])
-            today_activity = data['daily_activity'][today]
-            post_links = " | ".join(data['posts_links'][:3])
-            
-            row = [
-                nickname,
-                data['total_posts'],
-                data['total_comments'], 
-                most_active_commenter,
-                comment_diversity,
-                data['gender'],
-                data['city'],
-                today_activity,
-                post_links
-            ]
+    if nicknames is None:
+        nicknames = [row[0] for row in analytics_store.conn.execute(
+            "SELECT nickname FROM users ORDER BY total_posts + total_comments DESC")]
+    
+    for nickname in nicknames:
+        row = analytics_store.user_row(nickname, today)
+        if row is not None:
             analytics_summary.append(row)
     
     return analytics_summary
 
-def update_analytics_sheet(worksheet):
-    """Update analytics worksheet"""
+def update_analytics_sheet(worksheet, analytics_store, nicknames):
+    """Push only the changed user rows to the analytics worksheet
+    
+    Rows still showing TODAY_ACTIVITY from an earlier day are rewritten too.
+    """
     if not worksheet:
         return
+    today = datetime.now().strftime("%Y-%m-%d")
+    nicknames = set(nicknames) | analytics_store.stale_today_rows(today)
+    if not nicknames:
+        return
     
-    logger.info("Updating user analytics...")
+    logger.info(f"Updating user analytics for {len(nicknames)} users...")
     
     try:
         sheet = worksheet.spreadsheet
         
         try:
             analytics_ws = sheet.worksheet(ANALYTICS_SHEET)
+            fresh_tab = False
         except gspread.WorksheetNotFound:
             logger.info("Creating analytics worksheet...")
             analytics_ws = sheet.add_worksheet(title=ANALYTICS_SHEET, rows=1000, cols=10)
+            fresh_tab = True
         
-        analytics_ws.clear()
-        analytics_data_list = generate_analytics_data()
+        # First incremental run (or a recreated tab): start from a clean layout
+        if fresh_tab or not analytics_store.has_sheet_rows():
+            analytics_store.clear_sheet_rows()
+            sheets_call(analytics_ws.clear)
+            nicknames = [row[0] for row in generate_analytics_data(analytics_store)[1:]]
         
-        if analytics_data_list:
-            analytics_ws.append_rows(analytics_data_list, value_input_option="USER_ENTERED")
-            record_count = len(analytics_data_list) - 1
-            logger.info(f"Analytics updated: {record_count} user records")
-            stats.api_call()
+        rows = analytics_store.assign_rows(nicknames)
+        values = generate_analytics_data(analytics_store, list(rows))[1:]
+        
+        needed_rows = max(rows.values(), default=1)
+        if needed_rows > analytics_ws.row_count:
+            sheets_call(analytics_ws.add_rows, needed_rows - analytics_ws.row_count + 500)
+        
+        last_col = chr(ord("A") + len(ANALYTICS_HEADERS) - 1)
+        updates = [{"range": f"A1:{last_col}1", "values": [ANALYTICS_HEADERS]}]
+        updates += [{"range": f"A{rows[row[0]]}:{last_col}{rows[row[0]]}", "values": [row]}
+                    for row in values]
+        sheets_call(analytics_ws.batch_update, updates, value_input_option="USER_ENTERED")
+        analytics_store.note_today_written(values, today)
+        logger.info(f"Analytics updated: {len(values)} user rows rewritten")
         
     except Exception as e:
         logger.error(f"Analytics update failed: {e}")
 
+# ----------------- Interaction Graph -----------------
+# Author <- commenter interactions from the whole analytics history as a sparse
+# weighted adjacency matrix: A[author, commenter] = comments by commenter on author's posts
+TOP_COMMENTERS_HEADERS = ["AUTHOR", "RANK", "COMMENTER", "COMMENTS", "SHARE"]
+MUTUAL_PAIRS_HEADERS = ["USER_A", "USER_B", "A_ON_B", "B_ON_A", "MUTUAL", "TOTAL"]
+USER_GRAPH_HEADERS = ["RANK", "NICKNAME", "COMMENTERS", "COMMENTED_ON", "COMMENTS_RECEIVED",
+                      "COMMENTS_GIVEN", "MUTUAL_PARTNERS", "RECIPROCITY"]
+
+class InteractionGraph:
+    """Sparse author/commenter graph with integer user IDs (CSR, rows = authors)"""
+
+    def __init__(self, names, authors, commenters, counts):
+        self.names = names
+        n = len(names)
+        # Comments on one's own posts are not interactions
+        keep = authors != commenters
+        self.adj = sparse.coo_array((counts[keep], (authors[keep], commenters[keep])), shape=(n, n)).tocsr()
+        self.adj.sum_duplicates()
+        self.links = (self.adj > 0).astype(np.int32)
+        self.mutual = self.adj.minimum(self.adj.T).tocsr()
+        self.mutual.eliminate_zeros()
+
+    @classmethod
+    def from_store(cls, analytics_store):
+        ids = {}
+        names = []
+        authors = array("I")
+        commenters = array("I")
+        counts = array("I")
+        for author, commenter, count in analytics_store.conn.execute(
+                "SELECT author, commenter, count FROM commenters"):
+            for nickname, ids_out in ((author, authors), (commenter, commenters)):
+                uid = ids.get(nickname)
+                if uid is None:
+                    uid = ids[nickname] = len(names)
+                    names.append(nickname)
+                ids_out.append(uid)
+            counts.append(count)
+        return cls(names, np.frombuffer(authors, dtype=np.uint32).astype(np.int64),
+                   np.frombuffer(commenters, dtype=np.uint32).astype(np.int64),
+                   np.frombuffer(counts, dtype=np.uint32).astype(np.int64))
+
+    def __len__(self):
+        return len(self.names)
+
+    def top_commenters(self, k):
+        """(author, rank, commenter, comments, share) for each author's k heaviest commenters
+        
+        Authors are ordered by comments received.
+        """
+        adj = self.adj
+        rows = np.repeat(np.arange(adj.shape[0]), np.diff(adj.indptr))
+        received = np.asarray(adj.sum(axis=1)).ravel()
+        # One sort for all authors, then keep the first k entries of each author's run
+        order = np.lexsort((adj.indices, -adj.data, rows, -received[rows]))
+        sorted_rows = rows[order]
+        first = np.r_[True, sorted_rows[1:] != sorted_rows[:-1]]
+        rank = np.arange(len(order)) - np.flatnonzero(first)[np.cumsum(first) - 1]
+        keep = rank < k
+        names = self.names
+        return [(names[rows[i]], int(r) + 1, names[adj.indices[i]], int(adj.data[i]),
+                 round(float(adj.data[i] / received[rows[i]]), 3))
+                for i, r in zip(order[keep], rank[keep])]
+
+    def mutual_pairs(self):
+        """(user_a, user_b, a_on_b, b_on_a, mutual, total) for pairs that commented on each other, strongest first"""
+        upper = sparse.triu(self.mutual, k=1).tocoo()
+        if upper.nnz == 0:
+            return []
+        a, b = upper.row, upper.col
+        a_on_b = np.asarray(self.adj[b, a]).ravel()
+        b_on_a = np.asarray(self.adj[a, b]).ravel()
+        order = np.lexsort((-(a_on_b + b_on_a), -upper.data))
+        names = self.names
+        return [(names[a[i]], names[b[i]], int(a_on_b[i]), int(b_on_a[i]), int(upper.data[i]),
+                 int(a_on_b[i] + b_on_a[i])) for i in order]
+
+    def reciprocity(self):
+        """Share of directed links (and of comment weight) that are returned"""
+        links = self.links.sum()
+        weight = self.adj.sum()
+        return {
+            "links": round(float(self.links.multiply(self.links.T).sum() / links), 4) if links else 0.0,
+            "weighted": round(float(2 * sparse.triu(self.mutual, k=1).sum() / weight), 4) if weight else 0.0,
+        }
+
+    def degree_ranking(self):
+        """Per-user rows in USER_GRAPH_HEADERS order, ranked by distinct partners then comment volume"""
+        in_degree = np.asarray(self.links.sum(axis=1)).ravel()
+        out_degree = np.asarray(self.links.sum(axis=0)).ravel()
+        received = np.asarray(self.adj.sum(axis=1)).ravel()
+        given = np.asarray(self.adj.sum(axis=0)).ravel()
+        partners = np.diff(self.mutual.indptr)
+        either = (self.links + self.links.T).tocsr()
+        distinct = np.diff(either.indptr)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reciprocity = np.where(distinct > 0, partners / distinct, 0.0)
+        active = np.flatnonzero(distinct)
+        order = active[np.lexsort((-(received + given)[active], -(in_degree + out_degree)[active]))]
+        names = self.names
+        return [[rank, names[uid], int(in_degree[uid]), int(out_degree[uid]), int(received[uid]),
+                 int(given[uid]), int(partners[uid]), round(float(reciprocity[uid]), 3)]
+                for rank, uid in enumerate(order, start=1)]
+
+def replace_tab(spreadsheet, title, header, rows):
+    """Rewrite a derived tab from A1, creating or growing it as needed"""
+    try:
+        ws = spreadsheet.worksheet(title)
+    except gspread.WorksheetNotFound:
+        logger.info(f"Creating {title} worksheet...")
+        ws = spreadsheet.add_worksheet(title=title, rows=len(rows) + 10, cols=len(header))
+    if len(rows) + 1 > ws.row_count:
+        sheets_call(ws.add_rows, len(rows) + 1 - ws.row_count)
+    sheets_call(ws.clear)
+    sheets_call(ws.batch_update, [{"range": "A1", "values": [header] + rows}], value_input_option="RAW")
+
+def update_graph_sheets(worksheet, analytics_store):
+    """Rebuild the interaction graph from the analytics history and rewrite its tabs"""
+    if not worksheet:
+        return
+    
+    try:
+        started = time.monotonic()
+        graph = InteractionGraph.from_store(analytics_store)
+        if not graph.links.nnz:
+            return
+        reciprocity = graph.reciprocity()
+        logger.info(f"Interaction graph: {len(graph)} users, {graph.links.nnz} links, "
+                    f"reciprocity {reciprocity['links']:.1%} ({reciprocity['weighted']:.1%} of comments), "
+                    f"built in {time.monotonic() - started:.2f}s")
+    except Exception as e:
+        logger.error(f"Interaction graph build failed: {e}")
+        return
+    
+    # Each tab on its own, so one failing query or write does not block the others
+    tabs = {
+        TOP_COMMENTERS_SHEET: (TOP_COMMENTERS_HEADERS, lambda: graph.top_commenters(GRAPH_TOP_K)),
+        MUTUAL_PAIRS_SHEET: (MUTUAL_PAIRS_HEADERS, graph.mutual_pairs),
+        USER_GRAPH_SHEET: (USER_GRAPH_HEADERS, graph.degree_ranking),
+    }
+    for title, (header, query) in tabs.items():
+        try:
+            rows = [list(row) for row in query()[:GRAPH_MAX_ROWS]]
+            replace_tab(worksheet.spreadsheet, title, header, rows)
+            logger.info(f"{title} updated: {len(rows)} rows")
+        except Exception as e:
+            logger.error(f"{title} update failed: {e}")
+
+# ----------------- HTML Parsing -----------------
+# Fresh-list pages are parsed from a single page_source snapshot instead of
+# issuing one chromedriver round trip per find_element/get_attribute/.text call.
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+})
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "div", "dl", "dd", "dt",
+    "fieldset", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+    "tr", "td", "th", "ul"
+})
+SKIP_TEXT_TAGS = frozenset({"script", "style", "template", "noscript"})
+
+class HtmlNode:
+    """Lightweight element node built from the stdlib HTML parser"""
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = parent
+
+    def get(self, name):
+        """Attribute value or "" (mirrors get_attribute for present attrs)"""
+        return self.attrs.get(name) or ""
+
+    def has_class(self, cls):
+        return cls in self.get("class").split()
+
+    def iter(self):
+        """Yield descendant elements in document order"""
+        stack = [c for c in reversed(self.children) if isinstance(c, HtmlNode)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(c for c in reversed(node.children) if isinstance(c, HtmlNode))
+
+    def iter_find(self, tag=None, cls=None, attr=None, equals=None, contains=None):
+        for node in self.iter():
+            if tag and node.tag != tag:
+                continue
+            if cls and not node.has_class(cls):
+                continue
+            if attr:
+                if attr not in node.attrs:
+                    continue
+                value = node.get(attr)
+                if equals is not None and value != equals:
+                    continue
+                if contains is not None and contains not in value:
+                    continue
+            yield node
+
+    def find(self, tag=None, **kwargs):
+        return next(self.iter_find(tag, **kwargs), None)
+
+    def find_all(self, tag=None, **kwargs):
+        return list(self.iter_find(tag, **kwargs))
+
+    def own_text(self):
+        """Text of direct text children only (like XPath text())"""
+        return "".join(c for c in self.children if isinstance(c, str))
+
+    @property
+    def text(self):
+        """Rendered-ish text: block elements and <br> become line breaks"""
+        parts = []
+        self._collect_text(parts)
+        return "".join(parts).strip()
+
+    def _collect_text(self, parts):
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child)
+            elif child.tag == "br":
+                parts.append("\n")
+            elif child.tag not in SKIP_TEXT_TAGS:
+                block = child.tag in BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                child._collect_text(parts)
+                if block:
+                    parts.append("\n")
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = HtmlNode("#document")
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = HtmlNode(tag, {k: (v or "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = HtmlNode(tag, {k: (v or "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag; stray end tags are ignored
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+def parse_html(html):
+    """Parse an HTML document into an HtmlNode tree"""
+    builder = _TreeBuilder()
+    builder.feed(html or "")
+    builder.close()
+    return builder.root
+
+def find_articles(root):
+    """Equivalent of the 'article.mbl.bas-sh, article.mbl' selector"""
+    return root.find_all("article", cls="mbl")
+
+def find_author_link(node):
+    """Equivalent of the "[itemprop='author'] a" selector"""
+    for author in node.iter_find(attr="itemprop", equals="author"):
+        link = author.find("a")
+        if link is not None:
+            return link
+    return None
+
 # ----------------- Data Extraction Functions -----------------
 def extract_reply_count(article):
     """Extract reply count from article"""
-    try:
-        comment_count_elem = article.find_element(By.CSS_SELECTOR, "[itemprop='commentCount']")
-        count_text = comment_count_elem.text.strip()
-        match = re.search(r'(\d+)', count_text)
+    comment_count_elem = article.find(attr="itemprop", equals="commentCount")
+    if comment_count_elem is not None:
+        match = re.search(r'(\d+)', comment_count_elem.text)
         if match:
             return int(match.group(1))
-    except NoSuchElementException:
-        pass
     
-    try:
-        comments = article.find_elements(By.CSS_SELECTOR, "[itemprop='comment']")
-        return len(comments)
-    except:
-        pass
-    
-    return 0
+    return len(article.find_all(attr="itemprop", equals="comment"))
 
 def extract_reply_status(article):
     """Check reply status"""
-    try:
-        if article.find_elements(By.XPATH, ".//div[contains(text(),'REPLIES OFF')]"):
+    for div in article.iter_find("div"):
+        if 'REPLIES OFF' in div.own_text():
             return "OFF"
-        if article.find_elements(By.XPATH, ".//mark[contains(text(),'FOLLOW TO REPLY')]"):
+    for mark in article.iter_find("mark"):
+        if 'FOLLOW TO REPLY' in mark.own_text():
             return "FOLLOW"
-        reply_forms = article.find_elements(By.CSS_SELECTOR, "form[action*='direct-response']")
-        if reply_forms:
-            return "ON"
-    except:
-        pass
     return "ON"
 
 def extract_post_data(article, page_num, profiles_data):
-    """Extract post data with new structure"""
+    """Extract post data with new structure from a parsed article node"""
     data = {header: "" for header in HEADERS}
     data["C_PAGE#"] = f"Page {page_num}"
     
     try:
         # Author info
-        try:
-            author_elem = article.find_element(By.CSS_SELECTOR, "[itemprop='author'] a")
+        author_elem = find_author_link(article)
+        if author_elem is not None:
             nickname = clean_text(author_elem.text)
             data["B_NICKNAME"] = nickname
-            data["M_PRO-L"] = to_abs_url(author_elem.get_attribute("href"))
+            data["M_PRO-L"] = to_abs_url(author_elem.get("href"))
             
             # Profile lookup
             if nickname in profiles_data:
                 data["E_GENDER"] = profiles_data[nickname]['gender']
                 data["F_CITY"] = profiles_data[nickname]['city']
-        except NoSuchElementException:
-            pass
 
         # Profile image
-        try:
-            img = article.find_element(By.CSS_SELECTOR, "img")
-            img_src = img.get_attribute("data-src") or img.get_attribute("src")
+        img = article.find("img")
+        if img is not None:
+            img_src = img.get("data-src") or img.get("src")
             image_url = to_abs_url(img_src) if img_src else f"{BASE}/static/img/default-avatar-min.jpg"
-            
-            data["R_IMAGE-L"] = image_url
-            data["A_IMAGE"] = f'=IMAGE("{image_url}",4,35,35)'
-        except NoSuchElementException:
-            default_img = f"{BASE}/static/img/default-avatar-min.jpg"
-            data["R_IMAGE-L"] = default_img
-            data["A_IMAGE"] = f'=IMAGE("{default_img}",4,35,35)'
+        else:
+            image_url = f"{BASE}/static/img/default-avatar-min.jpg"
+        data["R_IMAGE-L"] = image_url
+        data["A_IMAGE"] = f'=IMAGE("{image_url}",4,35,35)'
 
         # Post text
-        try:
-            text_elem = article.find_element(By.CSS_SELECTOR, "[itemprop='text']")
+        text_elem = article.find(attr="itemprop", equals="text")
+        if text_elem is not None:
             data["D_TEXT-P"] = clean_text(text_elem.text)
-        except NoSuchElementException:
-            pass
 
         # Expiry detection
-        try:
-            if (article.find_elements(By.CSS_SELECTOR, "img[src*='clock.svg']") or 
-                article.find_elements(By.XPATH, ".//span[contains(@class,'tooltiptext') and contains(text(),'Expiring')]")):
-                data["G_EXPIRY"] = "⏳"
-        except:
-            pass
+        if (article.find("img", attr="src", contains="clock.svg") is not None or
+                any('Expiring' in span.own_text()
+                    for span in article.iter_find("span", attr="class", contains="tooltiptext"))):
+            data["G_EXPIRY"] = "⏳"
 
         # Reply count and status
         reply_count = extract_reply_count(article)
@@ -449,67 +1610,113 @@ def extract_post_data(article, page_num, profiles_data):
         data["I_R-ON"] = extract_reply_status(article)
 
         # Comments and analytics
-        try:
-            comments = article.find_elements(By.CSS_SELECTOR, "[itemprop='comment']")[:3]
-            comment_data = []
-            comment_links = []
-            commenter_names = []
-            
-            for comment in comments:
-                try:
-                    author_link = comment.find_element(By.CSS_SELECTOR, "[itemprop='author'] a")
-                    text_elem = comment.find_element(By.CSS_SELECTOR, "[itemprop='text']")
-                    
-                    comment_text = clean_text(text_elem.text)
-                    author_url = to_abs_url(author_link.get_attribute("href"))
-                    commenter_name = clean_text(author_link.text)
-                    
-                    comment_data.append(comment_text)
-                    comment_links.append(author_url)
-                    commenter_names.append(commenter_name)
-                except:
-                    comment_data.append("")
-                    comment_links.append("")
-                    commenter_names.append("")
-            
-            # Fill comment columns
-            data["J_COM1"] = comment_data[0] if len(comment_data) > 0 else ""
-            data["K_COM2"] = comment_data[1] if len(comment_data) > 1 else ""
-            data["L_COM3"] = comment_data[2] if len(comment_data) > 2 else ""
-            data["O_COM1-L"] = comment_links[0] if len(comment_links) > 0 else ""
-            data["P_COM2-L"] = comment_links[1] if len(comment_links) > 1 else ""
-            data["Q_COM3-L"] = comment_links[2] if len(comment_links) > 2 else ""
-            
-            # Update analytics
-            author = data["B_NICKNAME"]
-            if author:
-                today = datetime.now().strftime("%Y-%m-%d")
-                analytics_data[author]['total_posts'] += 1
-                analytics_data[author]['gender'] = data["E_GENDER"]
-                analytics_data[author]['city'] = data["F_CITY"]
-                analytics_data[author]['daily_activity'][today] += 1
-                
-                for commenter in commenter_names:
-                    if commenter:
-                        analytics_data[author]['commenters'][commenter] += 1
-                        analytics_data[commenter]['commented_on'].add(author)
-                        analytics_data[commenter]['total_comments'] += 1
-        except:
-            pass
+        comments = article.find_all(attr="itemprop", equals="comment")[:3]
+        comment_data = []
+        comment_links = []
+        commenter_names = []
+        
+        for comment in comments:
+            author_link = find_author_link(comment)
+            text_elem = comment.find(attr="itemprop", equals="text")
+            if author_link is not None and text_elem is not None:
+                comment_data.append(clean_text(text_elem.text))
+                comment_links.append(to_abs_url(author_link.get("href")))
+                commenter_names.append(clean_text(author_link.text))
+            else:
+                comment_data.append("")
+                comment_links.append("")
+                commenter_names.append("")
+        
+        # Fill comment columns
+        data["J_COM1"] = comment_data[0] if len(comment_data) > 0 else ""
+        data["K_COM2"] = comment_data[1] if len(comment_data) > 1 else ""
+        data["L_COM3"] = comment_data[2] if len(comment_data) > 2 else ""
+        data["O_COM1-L"] = comment_links[0] if len(comment_links) > 0 else ""
+        data["P_COM2-L"] = comment_links[1] if len(comment_links) > 1 else ""
+        data["Q_COM3-L"] = comment_links[2] if len(comment_links) > 2 else ""
+        
+        # Commenter names feed analytics once the post is written (not a sheet column)
+        data[COMMENTERS_KEY] = commenter_names
 
-        # Post link
-        if data["D_TEXT-P"]:
-            post_hash = text_hash(data["D_TEXT-P"])
-            data["N_POST-L"] = f"{BASE}/comments/text/{post_hash}"
-            
-            if data["B_NICKNAME"]:
-                analytics_data[data["B_NICKNAME"]]['posts_links'].append(data["N_POST-L"])
+        # Post link (permalink carries the post ID used as the row key)
+        for link in article.iter_find("a", attr="href", contains="/comments/text/"):
+            post_id = post_id_from_url(link.get("href"))
+            if post_id:
+                data["N_POST-L"] = post_url(post_id)
+                break
 
     except Exception as e:
         logger.error(f"Error extracting data: {e}")
 
     return data
 
+# ----------------- Request Scheduling -----------------
+class TokenBucket:
+    """Thread-safe token bucket; reserve() returns how long to wait for a token"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class HostRateLimiter:
+    """One token bucket per host"""
+
+    def __init__(self, rate=REQUEST_RATE, burst=REQUEST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+class RequestScheduler:
+    """Central politeness gate: every request to the site (page loads, login,
+    profile fetches) goes through navigation(); extraction never sleeps."""
+
+    def __init__(self, limiter, jitter=REQUEST_JITTER):
+        self.limiter = limiter
+        self.jitter = jitter
+
+    def wait(self, url):
+        delay = self.limiter.bucket(url).reserve()
+        if self.jitter > 0:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        stats.throttled(delay)
+        return delay
+
+    @contextmanager
+    def navigation(self, url, phase="page_load"):
+        self.wait(url)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            stats.navigated(time.monotonic() - start, phase)
+
+scheduler = RequestScheduler(HostRateLimiter())
+# Profile enrichment runs on its own session and budget so it never holds up page loads
+profile_scheduler = RequestScheduler(HostRateLimiter(PROFILE_RATE, 1))
+
 # ----------------- Authentication -----------------
 def login(driver):
     """Login to DamaDam"""
@@ -520,14 +1727,20 @@ def login(driver):
         return False
     
     try:
-        driver.get(LOGIN_URL)
+        with scheduler.navigation(LOGIN_URL, "login"):
+            driver.get(LOGIN_URL)
         WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "nick")))
         
         driver.find_element(By.ID, "nick").send_keys(USERNAME)
         driver.find_element(By.ID, "pass").send_keys(PASSWORD)
-        driver.find_element(By.CSS_SELECTOR, "form button, form input[type='submit']").click()
+        with scheduler.navigation(LOGIN_URL, "login"):
+            driver.find_element(By.CSS_SELECTOR, "form button, form input[type='submit']").click()
         
-        time.sleep(3)
+        # Wait for the post-login redirect instead of a fixed sleep
+        try:
+            WebDriverWait(driver, 10).until(lambda d: "login" not in d.current_url.lower())
+        except TimeoutException:
+            pass
         
         if "login" not in driver.current_url.lower():
             logger.info("Login successful!")
@@ -539,31 +1752,1069 @@ def login(driver):
         logger.error(f"Login process failed: {e}")
         return False
 
-# ----------------- Data Storage -----------------
-def get_existing_posts_sheets(worksheet):
-    """Get existing posts from Google Sheets"""
-    existing = {}
+def login_http(session):
+    """Login to DamaDam by posting the login form over an HTTP session"""
+    logger.info("Attempting login (HTTP)...")
+    
+    if not USERNAME or not PASSWORD:
+        logger.error("Username or password not provided in environment variables")
+        return False
+    
     try:
-        all_values = worksheet.get_all_records()
-        for idx, row in enumerate(all_values, start=2):
-            text = row.get("D_TEXT-P", "").strip()
-            if text:
-                existing[text_hash(text)] = {"row": idx, "data": row}
-        logger.info(f"Found {len(existing)} existing posts")
-        stats.api_call()
+        with scheduler.navigation(LOGIN_URL, "login"):
+            resp = session.get(LOGIN_URL, timeout=PAGE_TIMEOUT)
+        resp.raise_for_status()
+        root = parse_html(resp.text)
+        
+        nick_input = root.find("input", attr="id", equals="nick")
+        pass_input = root.find("input", attr="id", equals="pass")
+        if nick_input is None or pass_input is None:
+            logger.error("Login form not found on login page")
+            return False
+        
+        # Locate the enclosing form and carry over its hidden fields (CSRF token etc.)
+        form = nick_input.parent
+        while form is not None and form.tag != "form":
+            form = form.parent
+        payload = {}
+        if form is not None:
+            for field in form.iter_find("input", attr="type", equals="hidden"):
+                if field.get("name"):
+                    payload[field.get("name")] = field.get("value")
+        payload[nick_input.get("name") or "nick"] = USERNAME
+        payload[pass_input.get("name") or "pass"] = PASSWORD
+        action = form.get("action") if form is not None else ""
+        form_url = requests.compat.urljoin(resp.url, action) if action else resp.url
+        
+        with scheduler.navigation(form_url, "login"):
+            resp = session.post(form_url, data=payload, headers={"Referer": LOGIN_URL},
+                                timeout=PAGE_TIMEOUT)
+        resp.raise_for_status()
+        
+        if "login" not in resp.url.lower():
+            logger.info("Login successful!")
+            return True
+        else:
+            logger.error("Login failed - check credentials")
+            return False
+    except Exception as e:
+        logger.error(f"Login process failed: {e}")
+        return False
+
+# ----------------- Session Persistence -----------------
+def is_logged_in(html):
+    """Authenticated pages carry a logout link; the login page does not"""
+    if not html:
+        return False
+    root = parse_html(html)
+    return (root.find("a", attr="href", contains="logout") is not None or
+            root.find("form", attr="action", contains="logout") is not None)
+
+def session_cipher(salt, secret=None):
+    """Fernet cipher keyed from the session secret and a per-file salt"""
+    kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=200_000)
+    return Fernet(base64.urlsafe_b64encode(kdf.derive((secret or SESSION_SECRET).encode("utf-8"))))
+
+def load_session_cookies(path=COOKIE_FILE):
+    """Unexpired cookies saved by the last successful login"""
+    clear_session_cookies(LEGACY_COOKIE_FILE)
+    if not SESSION_SECRET:
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        cipher = session_cipher(base64.b64decode(saved["salt"]))
+        cookies = json.loads(cipher.decrypt(saved["token"].encode("ascii")))
+    except FileNotFoundError:
+        return []
+    except InvalidToken:
+        logger.warning("Saved session was encrypted with another secret - logging in again")
+        return []
+    except Exception as e:
+        logger.warning(f"Could not read saved session: {e}")
+        return []
+    now = time.time()
+    return [c for c in cookies if not c.get("expiry") or c["expiry"] > now]
+
+def save_session_cookies(cookies, path=COOKIE_FILE):
+    """Write cookies encrypted to an owner-only (0600) file"""
+    if not SESSION_SECRET:
+        logger.info("No SESSION_SECRET or DD_PASSWORD - session cookies are not saved")
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        salt = os.urandom(16)
+        token = session_cipher(salt).encrypt(json.dumps(cookies).encode("utf-8"))
+        # A unique temp file per writer (created 0600), so concurrent shard workers never race on it
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                        prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"salt": base64.b64encode(salt).decode("ascii"), "token": token.decode("ascii")}, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        logger.info(f"Session cookies saved ({len(cookies)} cookies)")
+    except Exception as e:
+        logger.warning(f"Could not save session cookies: {e}")
+
+def clear_session_cookies(path=COOKIE_FILE):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def authenticate(fetcher):
+    """Reuse the saved session when it is still valid, otherwise log in and save it"""
+    cookies = load_session_cookies()
+    if cookies:
+        logger.info("Restoring saved session...")
+        fetcher.set_cookies(cookies)
+        if is_logged_in(fetcher.fetch_url(SESSION_CHECK_URL, "login")):
+            logger.info("Saved session is valid - skipping login")
+            return True
+        logger.info("Saved session expired - logging in again")
+        clear_session_cookies()
+    
+    if not fetcher.login():
+        return False
+    save_session_cookies(fetcher.get_cookies())
+    return True
+
+# ----------------- Fetch Backends -----------------
+class ArticlesReady:
+    """WebDriverWait condition: the target page has articles and their count has settled
+    
+    Ready at once when the document has fully loaded; otherwise once the count of
+    article.mbl elements is unchanged for `stable_for` seconds. Returns the count.
+    """
+    SCRIPT = ("return [location.href, document.readyState, "
+              "document.querySelectorAll('article.mbl').length];")
+
+    def __init__(self, url, stable_for=READY_STABLE_SECONDS, check_url=PAGE_LOAD_STRATEGY == "none"):
+        self.url = url
+        self.stable_for = stable_for
+        self.check_url = check_url
+        self.count = -1
+        self.since = None
+
+    @staticmethod
+    def same_page(href, url):
+        """Same path and query, ignoring scheme, host, fragment and a default page=1"""
+        def normalize(value):
+            parts = urlsplit(value)
+            query = parse_qs(parts.query)
+            query.setdefault("page", ["1"])
+            return parts.path.rstrip("/"), sorted(query.items())
+        return normalize(href) == normalize(url)
+
+    def __call__(self, driver):
+        href, state, count = driver.execute_script(self.SCRIPT)
+        # driver.get returns on the new document except with the "none" strategy,
+        # where the previous page can still be showing
+        if (self.check_url and not self.same_page(href, self.url)) or count == 0:
+            self.count, self.since = -1, None
+            return False
+        if state == "complete":
+            return count
+        now = time.monotonic()
+        if count != self.count:
+            self.count, self.since = count, now
+            return False
+        return count if now - self.since >= self.stable_for else False
+
+class SeleniumFetcher:
+    """Fetch fresh-list pages through headless Chrome"""
+    name = "selenium"
+    max_in_flight = 1  # a single driver can only load one page at a time
+
+    def __init__(self):
+        self.driver = setup_driver()
+        self._lock = threading.Lock()  # page and profile fetches share one driver
+
+    def login(self):
+        return login(self.driver)
+
+    def get_cookies(self):
+        with self._lock:
+            return self.driver.get_cookies()
+
+    def set_cookies(self, cookies):
+        # CDP sets cookies without first navigating to the domain
+        for cookie in cookies:
+            params = {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie.get("domain") or urlsplit(BASE).hostname,
+                "path": cookie.get("path", "/"),
+                "secure": cookie.get("secure", False),
+                "httpOnly": cookie.get("httpOnly", False),
+            }
+            if cookie.get("expiry"):
+                params["expires"] = cookie["expiry"]
+            self.driver.execute_cdp_cmd("Network.setCookie", params)
+
+    def fetch_url(self, url, phase="profile_load"):
+        """Load any page (e.g. a profile) and return its HTML, or None on failure"""
+        with self._lock:
+            try:
+                with scheduler.navigation(url, phase):
+                    self.driver.get(url)
+                return self.driver.page_source
+            except Exception as e:
+                logger.error(f"Error loading {url}: {e}")
+                return None
+
+    def fetch_page(self, page_num):
+        """Load a fresh-list page and return its HTML, or None on failure"""
+        with self._lock:
+            return self._fetch_page(page_num)
+
+    def _fetch_page(self, page_num):
+        url = START_URL_TEMPLATE.format(page=page_num)
+        driver = self.driver
+        try:
+            logger.info(f"Loading URL: {url}")
+            if NETWORK_STATS:
+                network_stats(driver)  # discard entries from earlier navigations
+            start = time.monotonic()
+            with scheduler.navigation(url):
+                driver.get(url)
+            loaded = time.monotonic()
+            
+            logger.info("Waiting for articles to settle...")
+            try:
+                count = WebDriverWait(driver, PAGE_TIMEOUT, poll_frequency=READY_POLL_SECONDS).until(
+                    ArticlesReady(url)
+                )
+                logger.info(f"{count} articles ready after {time.monotonic() - loaded:.2f}s")
+            finally:
+                stats.observe("wait", time.monotonic() - loaded)
+                stats.page_record(page_num, load=round(loaded - start, 3),
+                                  wait=round(time.monotonic() - loaded, 3))
+            page_source = driver.page_source
+            stats.page_record(page_num, bytes=len(page_source))
+            network = network_stats(driver) if NETWORK_STATS else None
+            if network:
+                stats.page_record(page_num, **network)
+                logger.info(f"Page {page_num} network: {network['requests']} requests, "
+                            f"{network['blocked']} blocked, {network['transferred'] / 1024:.0f} KiB transferred")
+            return page_source
+            
+        except TimeoutException:
+            logger.warning(f"Timeout on page {page_num} - no articles found")
+            logger.info(f"Current URL: {driver.current_url}")
+            logger.info(f"Page title: {driver.title}")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading page {page_num}: {e}")
+            logger.info(f"Current URL: {driver.current_url}")
+            return None
+
+    def close(self):
+        self.driver.quit()
+        purge_profile_cookies(CHROME_PROFILE_DIR)
+        logger.info("Browser closed")
+
+class HttpFetcher:
+    """Fetch fresh-list pages directly over a pooled keep-alive HTTP session"""
+    name = "http"
+    max_in_flight = MAX_IN_FLIGHT
+
+    def __init__(self, request_scheduler=None, pool_size=None):
+        # Page fetches, comment-thread and profile workers can all hold a connection at once
+        pool_size = pool_size or max(HTTP_POOL_SIZE, MAX_IN_FLIGHT + PROFILE_WORKERS + COMMENT_WORKERS)
+        logger.info(f"Setting up HTTP session (pool size {pool_size})...")
+        self.scheduler = request_scheduler or scheduler
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.5,
+                              status_forcelist=(500, 502, 503, 504),
+                              allowed_methods=("GET",))
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+
+    def login(self):
+        return login_http(self.session)
+
+    def get_cookies(self):
+        return [{
+            "name": c.name,
+            "value": c.value,
+            "domain": c.domain,
+            "path": c.path,
+            "secure": c.secure,
+            "httpOnly": c.has_nonstandard_attr("HttpOnly"),
+            "expiry": c.expires,
+        } for c in self.session.cookies]
+
+    def set_cookies(self, cookies):
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                                     domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+
+    def fetch_url(self, url, phase="profile_load"):
+        """Fetch any page (e.g. a profile) and return its HTML, or None on failure"""
+        try:
+            with self.scheduler.navigation(url, phase):
+                resp = self.session.get(url, timeout=PAGE_TIMEOUT)
+            resp.raise_for_status()
+            return resp.text
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+
+    def fetch_page(self, page_num):
+        """Fetch a fresh-list page and return its HTML, or None on failure"""
+        url = START_URL_TEMPLATE.format(page=page_num)
+        try:
+            logger.info(f"Fetching URL: {url}")
+            start = time.monotonic()
+            with self.scheduler.navigation(url):
+                resp = self.session.get(url, timeout=PAGE_TIMEOUT)
+            stats.page_record(page_num, load=round(time.monotonic() - start, 3), bytes=len(resp.content))
+            resp.raise_for_status()
+            if "login" in resp.url.lower() and "login" not in url.lower():
+                logger.warning(f"Page {page_num} redirected to login: {resp.url}")
+            return resp.text
+        except Exception as e:
+            logger.error(f"Error fetching page {page_num}: {e}")
+            return None
+
+    def close(self):
+        self.session.close()
+        logger.info("HTTP session closed")
+
+def create_fetcher():
+    """Create the fetch backend selected by FETCH_MODE"""
+    if FETCH_MODE == "http":
+        return HttpFetcher()
+    if FETCH_MODE != "selenium":
+        logger.warning(f"Unknown FETCH_MODE '{FETCH_MODE}', falling back to selenium")
+    return SeleniumFetcher()
+
+class LazyFetcher:
+    """HTTP fetcher that is created and authenticated on first use
+    
+    The sharded-crawl coordinator only fetches on behalf of comment threads
+    and profile enrichment, so it skips the browser and the login entirely
+    when neither needs the site.
+    """
+
+    def __init__(self):
+        self._fetcher = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        with self._lock:
+            if self._fetcher is None:
+                fetcher = HttpFetcher()
+                if not authenticate(fetcher):
+                    logger.warning("Coordinator login failed - continuing with limited access")
+                self._fetcher = fetcher
+            return self._fetcher
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def close(self):
+        if self._fetcher is not None:
+            self._fetcher.close()
+
+# ----------------- Fetch Pipeline -----------------
+async def crawl_pages(fetcher, pages, handle_page):
+    """Fetch pages with bounded concurrency and hand each one to handle_page as it arrives
+    
+    handle_page(page_num, page_source) runs on a worker thread, one page at a time,
+    while the next fetches are already in flight.
+    """
+    in_flight = max(1, min(MAX_IN_FLIGHT, getattr(fetcher, "max_in_flight", 1)))
+    results = asyncio.Queue(maxsize=in_flight)
+    page_iter = iter(pages)
+    logger.info(f"Fetch pipeline: {in_flight} in flight, {REQUEST_RATE}/s per host (burst {REQUEST_BURST})")
+
+    async def fetch_worker():
+        # Politeness is applied inside fetch_page by the request scheduler
+        for page in page_iter:
+            page_source = await asyncio.to_thread(fetcher.fetch_page, page)
+            if page_source is not None:
+                stats.first_page()
+            await results.put((page, page_source))
+
+    async def consume():
+        while True:
+            item = await results.get()
+            if item is None:
+                return
+            try:
+                await asyncio.to_thread(handle_page, *item)
+            except Exception as e:
+                logger.error(f"Page {item[0]} processing failed: {e}")
+                stats.error()
+
+    consumer = asyncio.create_task(consume())
+    try:
+        await asyncio.gather(*(fetch_worker() for _ in range(in_flight)))
+    finally:
+        await results.put(None)
+        await consumer
+
+# ----------------- Incremental Crawl -----------------
+class IncrementalTracker:
+    """Decides when pagination can stop because pages only contain known posts
+    
+    Pages can complete out of order, so the consecutive-page streak is evaluated
+    in page order as results become contiguous. A post counts as known once it is
+    in the post store, i.e. its row reached Sheets.
+    """
+
+    def __init__(self, existing_posts, stop_after=STOP_AFTER_SEEN_PAGES, enabled=not FULL_CRAWL):
+        self.existing_posts = existing_posts
+        self.stop_after = max(1, stop_after)
+        self.enabled = enabled
+        self.page_keys = {}
+        self.page_all_seen = {}
+        self.next_page = 1
+        self.streak = 0
+        self.stop_page = None
+        self.done_pages = set()
+        self._lock = threading.Lock()
+
+    def is_known(self, key):
+        return key in self.existing_posts
+
+    def record_page(self, page, keys):
+        """Record the post keys found on a page; empty/failed pages never count as seen"""
+        with self._lock:
+            self.page_keys[page] = keys
+            self.page_all_seen[page] = bool(keys) and all(self.is_known(k) for k in keys)
+            self._advance()
+
+    def restore_page(self, page, keys, all_seen):
+        """Replay a page completed by an interrupted run; it will not be fetched again"""
+        with self._lock:
+            self.page_keys[page] = keys
+            self.page_all_seen[page] = all_seen
+            self.done_pages.add(page)
+            self._advance()
+
+    def _advance(self):
+        while self.next_page in self.page_all_seen and self.stop_page is None:
+            if self.page_all_seen[self.next_page]:
+                self.streak += 1
+            else:
+                self.streak = 0
+            if self.enabled and self.streak >= self.stop_after:
+                self.stop_page = self.next_page
+                logger.info(f"Pages {self.next_page - self.streak + 1}-{self.next_page} contain only "
+                            f"known posts - stopping pagination")
+            self.next_page += 1
+
+    @property
+    def stop_requested(self):
+        return self.stop_page is not None
+
+    def pages(self, max_pages):
+        """Page numbers to crawl, ending early once a stop is requested"""
+        for page in range(1, max_pages + 1):
+            if self.stop_requested:
+                logger.info(f"Incremental crawl: skipping pages {page}-{max_pages}")
+                return
+            if page not in self.done_pages:
+                yield page
+
+# ----------------- Checkpoint Journal -----------------
+class RunJournal:
+    """Append-only JSONL journal of a run's progress, fsynced at page boundaries
+    
+    Records: "run" (header), "page" (a completed page with its extracted rows),
+    "flush" (post keys written to Sheets), "merged" (analytics of every key flushed
+    so far are in analytics.db). The file is removed when a run
+    finishes cleanly, so a journal left on disk means the last run was interrupted.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.file = None
+
+    @staticmethod
+    def load(path=JOURNAL_FILE):
+        """Progress of an interrupted run, or None if there is nothing to resume"""
+        state = {"started": None, "pages": {}, "flushed": set(), "merged": set()}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    kind = record.get("type")
+                    if kind == "run":
+                        state["started"] = state["started"] or record.get("started")
+                    elif kind == "page":
+                        state["pages"][record["page"]] = record
+                    elif kind == "flush":
+                        state["flushed"].update(record.get("keys", []))
+                    elif kind == "merged":
+                        state["merged"].update(state["flushed"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read checkpoint journal: {e}")
+            return None
+        return state if state["pages"] else None
+
+    def start(self, resume=False):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        self._write({"type": "run", "started": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                     "resume": resume}, sync=True)
+
+    def _write(self, record, sync=False):
+        if self.file is None:
+            return
+        try:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.file.flush()
+            if sync:
+                os.fsync(self.file.fileno())
+        except Exception as e:
+            logger.error(f"Checkpoint journal write failed: {e}")
+
+    def page(self, page, rows, all_seen):
+        """Checkpoint a completed page (durable before the next page is handled)"""
+        self._write({"type": "page", "page": page, "all_seen": all_seen, "rows": rows}, sync=True)
+
+    def flushed(self, keys):
+        self._write({"type": "flush", "keys": list(keys)})
+
+    def merged(self):
+        """Analytics of the flushed rows are merged; a resume must not count them again"""
+        self._write({"type": "merged"}, sync=True)
+
+    def complete(self):
+        """Clean finish: nothing left to resume"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+# ----------------- Profile Enrichment -----------------
+PROFILE_LABELS = {"gender": ("gender",), "city": ("city", "location")}
+
+def parse_profile_page(html):
+    """Best-effort gender/city from a profile page (schema.org props, then labels)"""
+    root = parse_html(html)
+    found = {}
+    gender_elem = root.find(attr="itemprop", equals="gender")
+    if gender_elem is not None:
+        found["gender"] = clean_text(gender_elem.text)
+    city_elem = (root.find(attr="itemprop", equals="homeLocation") or
+                 root.find(attr="itemprop", equals="addressLocality"))
+    if city_elem is not None:
+        found["city"] = clean_text(city_elem.text)
+    
+    # "Gender: Male" on one line, or the label and value on consecutive lines
+    lines = [clean_text(line) for line in root.text.split("\n")]
+    lines = [line for line in lines if line]
+    for idx, line in enumerate(lines):
+        label, _, value = line.partition(":")
+        label = label.strip().lower()
+        for field, names in PROFILE_LABELS.items():
+            if field in found or label not in names:
+                continue
+            value = value.strip() or (lines[idx + 1] if idx + 1 < len(lines) else "")
+            if value and ":" not in value:
+                found[field] = value
+    return found.get("gender", ""), found.get("city", "")
+
+def profile_url(data):
+    return data.get("M_PRO-L") or f"{BASE}/users/{data.get('B_NICKNAME', '')}/"
+
+class ProfileEnricher:
+    """Fetch profile pages for nicknames missing from the Profiles sheet
+    
+    Runs on a small thread pool next to the crawl with its own HTTP session
+    (sharing the crawl's login cookies), so neither page fetching nor page
+    processing waits on it. Results go to the ProfileCache right away and are
+    appended to the Profiles sheet in batches; rows of the author that were
+    already flushed without gender/city get those cells backfilled through the
+    sink. Fetches not started by the end of the crawl are cancelled; those
+    nicknames are still unknown and are retried next run.
+    """
+
+    def __init__(self, fetcher, profiles, worksheet, sink=None, workers=PROFILE_WORKERS,
+                 limit=PROFILE_ENRICH_LIMIT):
+        self.fetcher = HttpFetcher(profile_scheduler, pool_size=max(1, workers))
+        self.source = fetcher  # login cookies are copied before the first profile fetch
+        self._cookie_lock = threading.Lock()
+        self.profiles = profiles
+        self.worksheet = worksheet
+        self.sink = sink
+        self.limit = limit
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="profile")
+        self.submitted = set()
+        self.futures = []
+        self.pending_rows = []
+        self.enriched = 0
+        self._lock = threading.Lock()
+
+    def submit_rows(self, batch_data):
+        """Queue profile fetches for the unknown authors of a page"""
+        for data in batch_data:
+            nickname = data.get("B_NICKNAME", "")
+            if not nickname or nickname in self.submitted or not self.profiles.needs_fetch(nickname):
+                continue
+            if len(self.submitted) >= self.limit:
+                return
+            self.submitted.add(nickname)
+            self.futures.append(self.pool.submit(self._enrich, nickname, profile_url(data)))
+
+    def _share_cookies(self):
+        with self._cookie_lock:
+            if self.source is None:
+                return
+            try:
+                self.fetcher.set_cookies(self.source.get_cookies())
+            except Exception as e:
+                logger.warning(f"Could not share session cookies with profile enrichment: {e}")
+            self.source = None
+
+    def _enrich(self, nickname, url):
+        self._share_cookies()
+        html = self.fetcher.fetch_url(url)
+        if html is None:
+            return
+        gender, city = parse_profile_page(html)
+        if not gender and not city:
+            self.profiles.put(nickname, "", "", "missing")
+            return
+        self.profiles.put(nickname, gender, city, "fetched")
+        if self.sink is not None:
+            self.sink.backfill_profile(nickname, gender, city)
+        with self._lock:
+            self.enriched += 1
+            self.pending_rows.append((nickname, gender, city))
+            due = len(self.pending_rows) >= PROFILE_SHEET_BATCH
+        if due:
+            self.flush_sheet()
+
+    def flush_sheet(self):
+        """Append enriched profiles to the Profiles sheet in one call"""
+        with self._lock:
+            rows, self.pending_rows = self.pending_rows, []
+        if not rows or not self.worksheet:
+            return
+        header = [h.strip().upper() for h in self.profiles.header()]
+        values = []
+        for nickname, gender, city in rows:
+            record = {"NICKNAME": nickname, "GENDER": gender, "CITY": city}
+            values.append([record.get(h, "") for h in header])
+        try:
+            profiles_ws = self.worksheet.spreadsheet.worksheet(PROFILES_SHEET)
+            sheets_call(profiles_ws.append_rows, values, value_input_option="USER_ENTERED")
+            self.profiles.note_appended(len(values))
+            logger.info(f"Appended {len(values)} enriched profiles to {PROFILES_SHEET}")
+        except Exception as e:
+            logger.warning(f"Could not append enriched profiles: {e}")
+
+    def close(self):
+        """Cancel fetches that have not started, finish running ones and write the remaining profiles"""
+        cancelled = sum(1 for future in self.futures if future.cancel())
+        for future in self.futures:
+            if future.cancelled():
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"Profile enrichment failed: {e}")
+        self.pool.shutdown(wait=True)
+        self.fetcher.close()
+        self.flush_sheet()
+        if self.submitted:
+            carried = f", {cancelled} left for the next run" if cancelled else ""
+            logger.info(f"Profile enrichment: {self.enriched}/{len(self.submitted) - cancelled} profiles found"
+                        f"{carried}")
+
+# ----------------- Comment Threads -----------------
+COMMENT_HEADERS = ["POST_ID", "POST-L", "AUTHOR", "NICKNAME", "PRO-L", "TEXT", "SCRAPED"]
+
+def parse_comment_thread(html):
+    """All comments on a post detail page as (nickname, profile link, text) tuples"""
+    comments = []
+    for comment in parse_html(html).find_all(attr="itemprop", equals="comment"):
+        author_link = find_author_link(comment)
+        text_elem = comment.find(attr="itemprop", equals="text")
+        if author_link is None:
+            continue
+        comments.append((clean_text(author_link.text), to_abs_url(author_link.get("href")),
+                         clean_text(text_elem.text) if text_elem is not None else ""))
+    return comments
+
+class ThreadCache:
+    """Comment threads already fetched, keyed by post ID with the reply count they were fetched at"""
+
+    def __init__(self, path=COMMENTS_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS threads (
+                    post_id     TEXT PRIMARY KEY,
+                    reply_count INTEGER NOT NULL,
+                    comments    TEXT NOT NULL,
+                    fetched_at  REAL NOT NULL
+                )
+            """)
+
+    def get(self, post_id):
+        """(reply_count, comments) of the cached thread, or None"""
+        with self._lock:
+            found = self.conn.execute("SELECT reply_count, comments FROM threads WHERE post_id = ?",
+                                      (post_id,)).fetchone()
+        if found is None:
+            return None
+        return found[0], [tuple(comment) for comment in json.loads(found[1])]
+
+    def put(self, post_id, reply_count, comments):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO threads (post_id, reply_count, comments, fetched_at) VALUES (?, ?, ?, ?)",
+                (post_id, reply_count, json.dumps(comments, ensure_ascii=False), time.time()))
+
+    def close(self):
+        self.conn.close()
+
+class CommentThreads:
+    """Fetch the full comment thread of posts with more replies than the list shows
+    
+    A page's detail pages are fetched on a small thread pool before its rows are
+    queued, so the sink records every commenter of a new post in analytics. For
+    posts stored in an earlier run only comments added since the last fetch are
+    counted. A thread whose reply count has not changed is never refetched.
+    """
+
+    def __init__(self, fetcher, store, worksheet=None, workers=COMMENT_WORKERS, limit=COMMENT_THREAD_LIMIT,
+                 sink_comments=COMMENTS_SINK):
+        self.fetcher = fetcher
+        self.store = store
+        self.worksheet = worksheet if sink_comments else None
+        self.limit = limit
+        self.cache = ThreadCache()
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="thread")
+        self.pending_rows = []
+        self.fetched = 0
+        self.cache_hits = 0
+        self.comments_added = 0
+
+    def enrich_rows(self, page, batch_data):
+        """Fill in full commenter lists for a page's busy posts; returns the number of threads fetched"""
+        jobs = []
+        for data in batch_data:
+            post_id = post_id_from_url(data.get("N_POST-L", ""))
+            shown = [name for name in data.get(COMMENTERS_KEY, []) if name]
+            try:
+                reply_count = int(data.get("H_REPLY") or 0)
+            except ValueError:
+                continue
+            if not post_id or reply_count <= len(shown):
+                continue
+            cached = self.cache.get(post_id)
+            if cached is not None and cached[0] == reply_count:
+                self.cache_hits += 1
+                self._apply(data, post_id, reply_count, cached[1], cached[1])
+                continue
+            if self.fetched >= self.limit:
+                continue
+            self.fetched += 1
+            jobs.append((data, post_id, reply_count, cached, self.pool.submit(
+                self.fetcher.fetch_url, post_url(post_id), "thread_load")))
+        
+        for data, post_id, reply_count, cached, future in jobs:
+            try:
+                html = future.result()
+                if html is None:
+                    continue
+                comments = parse_comment_thread(html)
+                self.cache.put(post_id, reply_count, comments)
+                self._apply(data, post_id, reply_count, cached[1] if cached else None, comments)
+            except Exception as e:
+                logger.warning(f"Comment thread {post_id} failed: {e}")
+        if jobs:
+            logger.info(f"Page {page}: fetched {len(jobs)} comment threads")
+        if len(self.pending_rows) >= SHEETS_FLUSH_ROWS:
+            self.flush_sheet()
+        return len(jobs)
+
+    def _apply(self, data, post_id, reply_count, previous, comments):
+        # New posts carry the full list into the sink; known posts only add what is new
+        # since the last fetch (or, on the first fetch, beyond the commenters shown on the list)
+        author = data.get("B_NICKNAME", "")
+        if post_key(data) not in self.store:
+            data[COMMENTERS_KEY] = [name for name, _, _ in comments]
+        elif author:
+            counted = (Counter(name for name, _, _ in previous) if previous is not None
+                       else Counter(name for name in data.get(COMMENTERS_KEY, []) if name))
+            added = Counter(name for name, _, _ in comments) - counted
+            analytics_data.record_comments(author, added.elements())
+        
+        if self.worksheet is None or previous is comments:
+            return
+        new_comments = Counter(comments) - Counter(previous or ())
+        if not new_comments:
+            return
+        scraped = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        link = post_url(post_id)
+        self.comments_added += sum(new_comments.values())
+        self.pending_rows.extend([post_id, link, author, nickname, profile, text, scraped]
+                                 for nickname, profile, text in new_comments.elements())
+
+    def flush_sheet(self):
+        """Append newly seen comments to the Comments tab in one call"""
+        rows, self.pending_rows = self.pending_rows, []
+        if not rows or self.worksheet is None:
+            return
+        try:
+            sheet = self.worksheet.spreadsheet
+            try:
+                comments_ws = sheet.worksheet(COMMENTS_SHEET)
+            except gspread.WorksheetNotFound:
+                logger.info("Creating comments worksheet...")
+                comments_ws = sheet.add_worksheet(title=COMMENTS_SHEET, rows=1000, cols=len(COMMENT_HEADERS))
+                sheets_call(comments_ws.batch_update, [{"range": "A1", "values": [COMMENT_HEADERS]}])
+            sheets_call(comments_ws.append_rows, rows, value_input_option="RAW", table_range="A1")
+            logger.info(f"Appended {len(rows)} comments to {COMMENTS_SHEET}")
+        except Exception as e:
+            logger.warning(f"Could not append comments: {e}")
+
+    def close(self):
+        """Stop the fetch pool and write the remaining comments"""
+        self.pool.shutdown(wait=True)
+        self.flush_sheet()
+        self.cache.close()
+        if self.fetched or self.cache_hits:
+            logger.info(f"Comment threads: {self.fetched} fetched, {self.cache_hits} unchanged (cached)")
+
+# ----------------- Data Storage -----------------
+class PostStore:
+    """Persistent SQLite store of scraped posts keyed by DamaDam post ID
+    
+    This is the source of truth for dedupe; the Sheets tab is a downstream
+    mirror. sheet_tab/sheet_row track where each post currently sits in Sheets.
+    Rows stored before post IDs were extracted keep their text-hash key until
+    adopt_legacy_keys() sees them again.
+    """
+
+    def __init__(self, path=POSTS_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    post_key   TEXT PRIMARY KEY,
+                    nickname   TEXT NOT NULL DEFAULT '',
+                    row_json   TEXT NOT NULL,
+                    sheet_row  INTEGER,
+                    first_seen TEXT NOT NULL,
+                    last_seen  TEXT NOT NULL
+                )
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(posts)")]
+            if "sheet_tab" not in columns:
+                # NULL means the main WORKSHEET_NAME tab (insert layout)
+                self.conn.execute("ALTER TABLE posts ADD COLUMN sheet_tab TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS posts_nickname ON posts(nickname)")
+
+    def __contains__(self, key):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM posts WHERE post_key = ?", (key,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def get(self, key):
+        """Stored row dict, sheet tab and sheet row for a key, or None"""
+        with self._lock:
+            found = self.conn.execute(
+                "SELECT row_json, sheet_row, sheet_tab FROM posts WHERE post_key = ?", (key,)).fetchone()
+        if found is None:
+            return None
+        return {"row": found[1], "tab": found[2], "data": json.loads(found[0])}
+
+    def add_many(self, rows, sheet_rows=None, sheet_tabs=None):
+        """Insert (key, data) pairs; existing keys are left untouched"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sheet_rows = sheet_rows or [None] * len(rows)
+        sheet_tabs = sheet_tabs or [None] * len(rows)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO posts "
+                "(post_key, nickname, row_json, sheet_row, sheet_tab, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(key, data.get("B_NICKNAME", ""), json.dumps(data, ensure_ascii=False), sheet_row, tab, now, now)
+                 for (key, data), sheet_row, tab in zip(rows, sheet_rows, sheet_tabs)]
+            )
+
+    def move_tab(self, old_tab, new_tab):
+        """Point rows recorded on a renamed tab (None = main tab) at its new title"""
+        with self._lock, self.conn:
+            if old_tab is None:
+                self.conn.execute("UPDATE posts SET sheet_tab = ? WHERE sheet_tab IS NULL", (new_tab,))
+            else:
+                self.conn.execute("UPDATE posts SET sheet_tab = ? WHERE sheet_tab = ?", (new_tab, old_tab))
+
+    def adopt_legacy_keys(self, batch_data):
+        """Re-key posts stored under the old text hash to their post ID; returns how many moved"""
+        moved = 0
+        with self._lock, self.conn:
+            for data in batch_data:
+                post_id = post_id_from_url(data.get("N_POST-L", ""))
+                old_key = legacy_key(data)
+                if not post_id or not old_key:
+                    continue
+                if self.conn.execute(
+                        "SELECT 1 FROM posts WHERE post_key = ?", (post_id,)).fetchone() is not None:
+                    continue
+                # The stored N_POST-L keeps the old link so the sink's diff rewrites that cell
+                moved += self.conn.execute("UPDATE posts SET post_key = ? WHERE post_key = ?",
+                                           (post_id, old_key)).rowcount
+        return moved
+
+    def keys_missing_profile(self, nickname):
+        """Keys of stored posts by `nickname` that were written without gender and city"""
+        with self._lock:
+            found = self.conn.execute(
+                "SELECT post_key, row_json FROM posts WHERE nickname = ?", (nickname,)).fetchall()
+        keys = []
+        for key, row_json in found:
+            data = json.loads(row_json)
+            if not data.get("E_GENDER") and not data.get("F_CITY"):
+                keys.append(key)
+        return keys
+
+    def update_rows(self, changes):
+        """Merge changed fields into stored rows ({key: {column: value}})"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self.conn:
+            for key, fields in changes.items():
+                found = self.conn.execute(
+                    "SELECT row_json FROM posts WHERE post_key = ?", (key,)).fetchone()
+                if found is None:
+                    continue
+                row = json.loads(found[0])
+                row.update(fields)
+                self.conn.execute("UPDATE posts SET row_json = ?, last_seen = ? WHERE post_key = ?",
+                                  (json.dumps(row, ensure_ascii=False), now, key))
+
+    def shift_sheet_rows(self, count):
+        """Account for `count` rows inserted at the top of the main tab"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE posts SET sheet_row = sheet_row + ? "
+                "WHERE sheet_row IS NOT NULL AND sheet_tab IS NULL", (count,))
+
+    def seed_from_sheet(self, worksheet, tab=None):
+        """One-time bootstrap of an empty store from the existing sheet rows"""
+        existing = get_existing_posts_sheets(worksheet)
+        keys = list(existing)
+        self.add_many([(key, existing[key]["data"]) for key in keys],
+                      [existing[key]["row"] for key in keys], [tab] * len(keys))
+        logger.info(f"Post store seeded with {len(keys)} posts from Google Sheets ({worksheet.title})")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+def open_post_store(worksheet, layout=None):
+    """Open the local post store, seeding it from the sheet only when empty"""
+    store = PostStore()
+    count = len(store)
+    if layout is not None and layout.archived_title:
+        store.move_tab(None, layout.archived_title)
+    if count == 0:
+        logger.info("Post store is empty - seeding from Google Sheets")
+        if layout is None:
+            store.seed_from_sheet(worksheet)
+        else:
+            for tab in layout.data_tabs():
+                store.seed_from_sheet(tab, tab.title)
+    else:
+        logger.info(f"Post store loaded: {count} known posts ({store.path})")
+    return store
+
+def get_existing_posts_sheets(worksheet):
+    """Get existing posts from Google Sheets"""
+    existing = {}
+    try:
+        all_values = sheets_call(worksheet.get_all_records)
+        for idx, row in enumerate(all_values, start=2):
+            text = str(row.get("D_TEXT-P", "")).strip()
+            if text:
+                existing[post_key({"D_TEXT-P": text, "N_POST-L": str(row.get("N_POST-L", ""))})] = {
+                    "row": idx, "data": row}
+        logger.info(f"Found {len(existing)} existing posts")
     except Exception as e:
         logger.error(f"Error reading from Google Sheets: {e}")
     return existing
 
-def update_batch_in_sheets(worksheet, batch_data, existing_posts):
-    """Update batch data in sheets"""
+SHEETS_READ_METHODS = {"get", "get_all_values", "get_all_records", "row_values", "col_values", "batch_get",
+                       "worksheets"}
+
+def sheets_call(fn, *args, **kwargs):
+    """Call a Sheets API method, backing off on quota (429) and server errors"""
+    phase = "sheets_read" if getattr(fn, "__name__", "") in SHEETS_READ_METHODS else "sheets_write"
+    for attempt in range(SHEETS_MAX_RETRIES + 1):
+        try:
+            with stats.timed(phase):
+                result = fn(*args, **kwargs)
+            stats.api_call()
+            return result
+        except gspread.exceptions.APIError as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status not in (429, 500, 502, 503) or attempt == SHEETS_MAX_RETRIES:
+                raise
+            wait = min(60, 5 * 2 ** attempt) + random.uniform(0, 1)
+            logger.warning(f"Sheets API error {status}, retrying in {wait:.0f}s...")
+            time.sleep(wait)
+
+def update_batch_in_sheets(worksheet, batch_data, existing_posts, layout=None):
+    """Write the new posts of a batch to the sheet (append to partitions, or insert at the top)"""
     if not worksheet:
         return False
     
     try:
         new_posts = 0
-        updated_posts = 0
         insert_rows = []
+        insert_keys = []
+        batch_keys = set()
         
         logger.info(f"Processing {len(batch_data)} posts...")
         
@@ -573,7 +2824,7 @@ def update_batch_in_sheets(worksheet, batch_data, existing_posts):
             if not text:
                 continue
                 
-            hash_key = text_hash(text)
+            key = post_key(data)
 
             # >>> CHANGE: Inject SCRAPE_TIME at the moment of preparing the row for insertion.
             # This ensures the sheet's first column contains exact time when we pushed the row.
@@ -582,23 +2833,26 @@ def update_batch_in_sheets(worksheet, batch_data, existing_posts):
             # Build row values following HEADERS order
             row_values = [data.get(h, "") for h in HEADERS]
             
-            if hash_key not in existing_posts:
+            # Dedupe against the store and within this batch
+            if key not in existing_posts and key not in batch_keys:
+                batch_keys.add(key)
                 insert_rows.append(row_values)
+                insert_keys.append((key, dict(data)))
                 new_posts += 1
             # For GitHub Actions, we'll focus on new posts only to keep it simple
         
-        # Insert new rows at the top (batch insert for speed)
-        if insert_rows:
+        if insert_rows and layout is not None:
+            logger.info(f"Appending {len(insert_rows)} new posts to partition tabs...")
+            positions = layout.append(insert_rows)
+            existing_posts.add_many(insert_keys, [row for _, row in positions], [tab for tab, _ in positions])
+        # Insert new rows at the top in one call; position at row=2 keeps header on top
+        elif insert_rows:
             logger.info(f"Inserting {len(insert_rows)} new posts (batch)...")
-            try:
-                # insert_rows inserts multiple rows at once; position at row=2 keeps header on top
-                worksheet.insert_rows(insert_rows, row=2, value_input_option="USER_ENTERED")
-            except Exception as e:
-                # Fallback: some gspread versions may not support insert_rows with value_input_option.
-                logger.warning(f"Batch insert failed, falling back to row-by-row insert: {e}")
-                for row_data in insert_rows:
-                    worksheet.insert_row(row_data, index=2, value_input_option="USER_ENTERED")
-            stats.api_call()
+            sheets_call(worksheet.insert_rows, insert_rows, row=2, value_input_option="USER_ENTERED")
+            
+            # Record the inserted posts only once they are in the sheet
+            existing_posts.shift_sheet_rows(len(insert_rows))
+            existing_posts.add_many(insert_keys, list(range(2, 2 + len(insert_rows))))
         
         logger.info(f"Batch complete: {new_posts} new posts added")
         return True
@@ -607,50 +2861,602 @@ def update_batch_in_sheets(worksheet, batch_data, existing_posts):
         logger.error(f"Batch update failed: {e}")
         return False
 
-# ----------------- Main Scraping Logic -----------------
-def scrape_batch(driver, page_num, profiles_data):
-    """Scrape a single page with detailed logging"""
-    url = START_URL_TEMPLATE.format(page=page_num)
-    logger.info(f"Scraping page {page_num}: {url}")
+class SheetLayout:
+    """Append-only partitioned layout for post rows
+    
+    New rows are appended to dated partition tabs (WORKSHEET_NAME-<period>,
+    with " #2", " #3"... once PARTITION_MAX_ROWS is reached), so a write never
+    shifts existing rows. The main tab only holds a formula view of the newest
+    rows across the latest VIEW_PARTITIONS partitions.
+    """
+
+    def __init__(self, main, period_format=PARTITION_FORMAT, max_rows=PARTITION_MAX_ROWS):
+        self.main = main
+        self.spreadsheet = main.spreadsheet
+        self.period_format = period_format
+        self.max_rows = max(2, max_rows)
+        self.archive_title = f"{WORKSHEET_NAME}-archive"
+        self.archived_title = None
+        self.partition_re = re.compile(rf"^{re.escape(WORKSHEET_NAME)}-(\d[\d-]*)(?: #(\d+))?$")
+        self.tabs = {}
+        self.used_rows = {}
+        self.partitions = None
+
+    def _titles(self):
+        """Partition tab titles, newest first"""
+        if self.partitions is None:
+            found = []
+            for ws in sheets_call(self.spreadsheet.worksheets):
+                match = self.partition_re.match(ws.title)
+                if match:
+                    self.tabs.setdefault(ws.title, ws)
+                    found.append((match.group(1), int(match.group(2) or 1), ws.title))
+            self.partitions = [title for _, _, title in sorted(found, reverse=True)]
+        return list(self.partitions)
+
+    def worksheet(self, title):
+        if title not in self.tabs:
+            self.tabs[title] = self.spreadsheet.worksheet(title)
+        return self.tabs[title]
+
+    def data_tabs(self):
+        """Every tab holding post rows: partitions plus the archived main tab"""
+        tabs = [self.worksheet(title) for title in self._titles()]
+        try:
+            tabs.append(self.worksheet(self.archive_title))
+        except gspread.WorksheetNotFound:
+            pass
+        return tabs
+
+    def prepare(self):
+        """Move legacy rows off the main tab (renamed to the archive) and set up the view"""
+        first = sheets_call(self.main.get, "A2", value_render_option="FORMULA")
+        value = str(first[0][0]) if first and first[0] else ""
+        if value and not value.startswith("="):
+            title = self.archive_title
+            logger.info(f"Moving existing {WORKSHEET_NAME} rows to '{title}' for the partitioned layout")
+            sheets_call(self.main.update_title, title)
+            self.tabs[title] = self.main
+            self.archived_title = title
+            self.main = self.spreadsheet.add_worksheet(title=WORKSHEET_NAME, rows=VIEW_ROWS + 10,
+                                                       cols=len(HEADERS))
+            sheets_call(self.main.append_row, HEADERS)
+        self.refresh_view()
+        return self.main
+
+    def _new_partition(self, period):
+        existing = [t for t in self._titles() if t.split(" #")[0] == f"{WORKSHEET_NAME}-{period}"]
+        title = f"{WORKSHEET_NAME}-{period}"
+        if existing:
+            title += f" #{len(existing) + 1}"
+        logger.info(f"Creating partition tab: {title}")
+        ws = self.spreadsheet.add_worksheet(title=title, rows=1000, cols=len(HEADERS))
+        sheets_call(ws.append_row, HEADERS)
+        self.tabs[title] = ws
+        self.used_rows[title] = 1
+        self.partitions = None
+        return title
+
+    def _target(self, period, incoming):
+        """Partition tab for a period with room for `incoming` more rows"""
+        base = f"{WORKSHEET_NAME}-{period}"
+        titles = [t for t in self._titles() if t.split(" #")[0] == base]
+        if not titles:
+            return self._new_partition(period), True
+        title = titles[0]
+        if title not in self.used_rows:
+            self.used_rows[title] = len(sheets_call(self.worksheet(title).col_values, 1))
+        if self.used_rows[title] > 1 and self.used_rows[title] + incoming > self.max_rows:
+            return self._new_partition(period), True
+        return title, False
+
+    def append(self, rows):
+        """Append row value lists to their partitions; returns (tab, row) per input row"""
+        groups = defaultdict(list)
+        for index, row in enumerate(rows):
+            try:
+                period = datetime.strptime(str(row[0])[:19], "%Y-%m-%d %H:%M:%S").strftime(self.period_format)
+            except ValueError:
+                period = datetime.now().strftime(self.period_format)
+            groups[period].append(index)
+        
+        positions = [None] * len(rows)
+        created = False
+        for period, indexes in sorted(groups.items()):
+            title, new_tab = self._target(period, len(indexes))
+            created = created or new_tab
+            sheets_call(self.worksheet(title).append_rows, [rows[i] for i in indexes],
+                        value_input_option="USER_ENTERED", table_range="A1")
+            start = self.used_rows[title] + 1
+            for offset, index in enumerate(indexes):
+                positions[index] = (title, start + offset)
+            self.used_rows[title] += len(indexes)
+        if created:
+            self.refresh_view()
+        return positions
+
+    def view_formula(self):
+        titles = self._titles()[:max(1, VIEW_PARTITIONS)]
+        if not titles:
+            return ""
+        last_col = column_letter(len(HEADERS))
+        ranges = ";".join(f"'{title}'!A2:{last_col}" for title in titles)
+        keys = ";".join(f"'{title}'!A2:A" for title in titles)
+        return (f'=IFERROR(ARRAY_CONSTRAIN(SORT(FILTER({{{ranges}}},{{{keys}}}<>""),1,FALSE),'
+                f'{VIEW_ROWS},{len(HEADERS)}),"")')
+
+    def refresh_view(self):
+        """Point the main tab's newest-first view at the latest partitions"""
+        formula = self.view_formula()
+        if not formula:
+            return
+        current = sheets_call(self.main.get, "A2", value_render_option="FORMULA")
+        if current and current[0] and current[0][0] == formula:
+            return
+        sheets_call(self.main.batch_update, [{"range": "A2", "values": [[formula]]}],
+                    value_input_option="USER_ENTERED")
+        logger.info(f"{WORKSHEET_NAME} view now shows the newest rows of the latest partitions")
+
+def changed_cells(stored, data):
+    """UPDATE_COLUMNS whose freshly scraped value differs from the stored row"""
+    return {column: data.get(column, "") for column in UPDATE_COLUMNS
+            if str(stored.get(column, "")) != str(data.get(column, ""))}
+
+def update_cells_in_sheets(worksheet, changes, existing_posts, layout=None):
+    """Rewrite changed cells of existing rows in place with one batch update per tab"""
+    if not worksheet:
+        return False
     
     try:
-        logger.info(f"Loading URL: {url}")
-        driver.get(url)
-        human_delay()
+        ranges_by_tab = defaultdict(list)
+        for key, fields in changes.items():
+            found = existing_posts.get(key)
+            if found is None or not found["row"]:
+                continue
+            row = found["row"]
+            ranges = ranges_by_tab[found["tab"]]
+            # One range per run of adjacent changed columns (e.g. H:I, J:L, N:Q)
+            columns = sorted(HEADERS.index(column) + 1 for column in fields)
+            start = prev = columns[0]
+            for col in columns[1:] + [None]:
+                if col is not None and col == prev + 1:
+                    prev = col
+                    continue
+                ranges.append({
+                    "range": f"{column_letter(start)}{row}:{column_letter(prev)}{row}",
+                    "values": [[fields[HEADERS[c - 1]] for c in range(start, prev + 1)]],
+                })
+                if col is not None:
+                    start = prev = col
         
-        logger.info("Waiting for articles to load...")
-        WebDriverWait(driver, PAGE_TIMEOUT).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "article.mbl"))
-        )
-        logger.info("Articles container found, waiting for content...")
-        time.sleep(1)  # Wait for lazy loading
+        for tab, ranges in ranges_by_tab.items():
+            if tab is None:
+                target = worksheet
+            elif layout is not None:
+                target = layout.worksheet(tab)
+            else:
+                target = worksheet.spreadsheet.worksheet(tab)
+            logger.info(f"Updating {len(ranges)} ranges of existing posts in {target.title}...")
+            sheets_call(target.batch_update, ranges, value_input_option="USER_ENTERED")
+        existing_posts.update_rows(changes)
+        return True
         
-    except TimeoutException:
-        logger.warning(f"Timeout on page {page_num} - no articles found")
-        logger.info(f"Current URL: {driver.current_url}")
-        logger.info(f"Page title: {driver.title}")
-        return []
     except Exception as e:
-        logger.error(f"Error loading page {page_num}: {e}")
-        logger.info(f"Current URL: {driver.current_url}")
-        return []
+        logger.error(f"In-place update failed: {e}")
+        return False
+
+class SheetsSink:
+    """Write-behind buffer for new post rows and changed cells of existing rows
     
-    # Find articles
-    articles = driver.find_elements(By.CSS_SELECTOR, "article.mbl.bas-sh, article.mbl")
+    Rows are collected across pages and written with one batched insert once
+    SHEETS_FLUSH_ROWS rows are pending or SHEETS_FLUSH_SECONDS have passed;
+    changed reply/comment cells of known posts go out in one batch update per flush.
+    Use as a context manager so pending rows are flushed on shutdown and on errors.
+    """
+
+    def __init__(self, worksheet, store, profiles=None, flush_rows=SHEETS_FLUSH_ROWS,
+                 flush_seconds=SHEETS_FLUSH_SECONDS, update_existing=SHEETS_UPDATE_EXISTING, layout=None,
+                 journal=None):
+        self.worksheet = worksheet
+        self.layout = layout
+        self.journal = journal
+        self.store = store
+        self.profiles = profiles
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        self.update_existing = update_existing
+        self.pending = []
+        self.pending_keys = set()
+        self.pending_updates = {}
+        self.oldest_pending = None
+        self.flushes = 0
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            logger.warning(f"Flushing {len(self.pending)} pending rows and "
+                           f"{len(self.pending_updates)} updates after error: {exc}")
+        self.flush()
+        return False
+
+    def add(self, batch_data):
+        """Queue new posts from a page; returns how many were queued"""
+        queued = 0
+        with self._lock:
+            for data in batch_data:
+                key = post_key(data)
+                if not key or key in self.pending_keys:
+                    continue
+                if key in self.store:
+                    if self.update_existing:
+                        self._diff(key, data)
+                    continue
+                self.pending_keys.add(key)
+                self.pending.append(data)
+                queued += 1
+            if (self.pending or self.pending_updates) and self.oldest_pending is None:
+                self.oldest_pending = time.monotonic()
+            if self._due():
+                self.flush()
+        return queued
+
+    def _diff(self, key, data):
+        """Queue the cells of a known post that changed since it was stored"""
+        stored = self.store.get(key)
+        if stored is None:
+            return
+        current = dict(stored["data"], **self.pending_updates.get(key, {}))
+        fields = changed_cells(current, data)
+        if fields:
+            self.pending_updates.setdefault(key, {}).update(fields)
+
+    def backfill_profile(self, nickname, gender, city):
+        """Queue gender/city cells for flushed rows of an author whose profile just arrived"""
+        with self._lock:
+            keys = [key for key in self.store.keys_missing_profile(nickname) if key not in self.pending_keys]
+            for key in keys:
+                self.pending_updates.setdefault(key, {}).update({"E_GENDER": gender, "F_CITY": city})
+            if keys and self.oldest_pending is None:
+                self.oldest_pending = time.monotonic()
+        return len(keys)
+
+    def tick(self):
+        """Flush if the time limit has passed; called once per page so a run of
+        known or empty pages cannot hold rows back past SHEETS_FLUSH_SECONDS"""
+        with self._lock:
+            if self._due():
+                return self.flush()
+        return True
+
+    def _due(self):
+        if len(self.pending) + len(self.pending_updates) >= self.flush_rows:
+            return True
+        return (self.oldest_pending is not None and
+                time.monotonic() - self.oldest_pending >= self.flush_seconds)
+
+    def flush(self):
+        """Write pending rows and cell updates; anything that fails stays queued"""
+        with self._lock:
+            if not self.pending and not self.pending_updates:
+                return True
+            # New rows go first so updates use sheet rows after the insert shift
+            ok = self._flush_rows()
+            if ok and self.pending_updates:
+                count = len(self.pending_updates)
+                if update_cells_in_sheets(self.worksheet, self.pending_updates, self.store, self.layout):
+                    stats.add_posts(0, count)
+                    self.pending_updates = {}
+                else:
+                    logger.error(f"{count} row updates remain unflushed")
+                    stats.error()
+                    ok = False
+            if ok:
+                self.flushes += 1
+                self.oldest_pending = None
+            return ok
+
+    def _flush_rows(self):
+        with self._lock:
+            if not self.pending:
+                return True
+            count = len(self.pending)
+            logger.info(f"Flushing {count} buffered rows to Google Sheets...")
+            # Profiles enriched since the row was extracted fill in the blanks
+            if self.profiles is not None:
+                for data in self.pending:
+                    nickname = data.get("B_NICKNAME", "")
+                    if not data.get("E_GENDER") and not data.get("F_CITY") and nickname in self.profiles:
+                        data["E_GENDER"] = self.profiles[nickname]['gender']
+                        data["F_CITY"] = self.profiles[nickname]['city']
+            if not update_batch_in_sheets(self.worksheet, self.pending, self.store, self.layout):
+                logger.error(f"{count} rows remain unflushed")
+                stats.error()
+                return False
+            stats.add_posts(count, 0)
+            if self.journal:
+                self.journal.flushed(self.pending_keys)
+            for data in self.pending:
+                record_post_analytics(data)
+            self.pending = []
+            self.pending_keys = set()
+            return True
+
+# ----------------- Backup Export -----------------
+class ExportPart:
+    """One gzip-compressed export file, opened for appending"""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.raw = open(path, "ab")
+        is_new = self.raw.tell() == 0
+        self.gz = gzip.GzipFile(fileobj=self.raw, mode="ab")
+        self.text = io.TextIOWrapper(self.gz, encoding="utf-8", newline="")
+        if fmt == "csv":
+            self.writer = csv.DictWriter(self.text, fieldnames=HEADERS, extrasaction="ignore")
+            if is_new:
+                self.writer.writeheader()
+
+    def write(self, data):
+        if self.fmt == "csv":
+            self.writer.writerow(data)
+        else:
+            self.text.write(json.dumps({h: data.get(h, "") for h in HEADERS}, ensure_ascii=False) + "\n")
+        self.rows += 1
+
+    def sync(self, fsync=True):
+        """Flush everything written so far to a decodable gzip block (and to disk)"""
+        self.text.flush()
+        self.gz.flush()
+        self.raw.flush()
+        if fsync:
+            os.fsync(self.raw.fileno())
+
+    def close(self, fsync=True):
+        self.text.close()  # also writes the gzip trailer
+        self.raw.flush()
+        if fsync:
+            os.fsync(self.raw.fileno())
+        self.raw.close()
+
+class StreamingExporter:
+    """Append-only backup of every scraped row, written as each page completes
+    
+    Files live under EXPORT_DIR/date=YYYY-MM-DD/ (by scrape date), one per
+    format and rotation part, so memory use does not grow with the crawl.
+    manifest.json lists every file with its row count and whether it was closed.
+    """
+
+    def __init__(self, root=EXPORT_DIR, formats=EXPORT_FORMATS, rotate_rows=EXPORT_ROTATE_ROWS,
+                 fsync=EXPORT_FSYNC):
+        self.root = root
+        self.formats = [fmt for fmt in formats if fmt in ("csv", "ndjson")]
+        self.rotate_rows = max(1, rotate_rows)
+        self.fsync = fsync
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.parts = {}
+        self.part_numbers = defaultdict(int)
+        self.rows = 0
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.manifest = self._load_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"files": {}}
+        except Exception as e:
+            logger.warning(f"Export manifest unreadable, starting a new one: {e}")
+            return {"files": {}}
+
+    def _part(self, day, fmt):
+        part = self.parts.get((day, fmt))
+        if part is not None and part.rows >= self.rotate_rows:
+            self._close_part(day, fmt)
+            part = None
+        if part is None:
+            self.part_numbers[(day, fmt)] += 1
+            name = f"posts-{self.run_id}-{self.part_numbers[(day, fmt)]:03d}.{fmt}.gz"
+            part = ExportPart(os.path.join(self.root, f"date={day}", name), fmt)
+            self.parts[(day, fmt)] = part
+        return part
+
+    def _close_part(self, day, fmt):
+        part = self.parts.pop((day, fmt))
+        part.close(fsync=self.fsync != "none")
+        self._record(part, complete=True)
+
+    def _record(self, part, complete=False):
+        rel = os.path.relpath(part.path, self.root)
+        self.manifest["files"][rel] = {
+            "format": part.fmt,
+            "rows": part.rows,
+            "bytes": os.path.getsize(part.path),
+            "run": self.run_id,
+            "complete": complete,
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def _write_manifest(self, fsync):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+
+    def write_page(self, batch_data):
+        """Append a completed page's rows, then checkpoint per the fsync policy"""
+        if not batch_data or not self.formats:
+            return
+        try:
+            scraped_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for data in batch_data:
+                if not data.get("SCRAPE_TIME"):
+                    data = dict(data, SCRAPE_TIME=scraped_at)
+                day = data["SCRAPE_TIME"][:10]
+                for fmt in self.formats:
+                    self._part(day, fmt).write(data)
+                self.rows += 1
+            if self.fsync == "page":
+                self.checkpoint()
+        except Exception as e:
+            logger.error(f"Backup export failed: {e}")
+            stats.error()
+
+    def checkpoint(self, fsync=True):
+        """Make all rows written so far durable and record them in the manifest"""
+        for part in self.parts.values():
+            part.sync(fsync)
+            self._record(part)
+        self._write_manifest(fsync)
+
+    def close(self):
+        try:
+            for day, fmt in list(self.parts):
+                self._close_part(day, fmt)
+            if self.rows:
+                self._write_manifest(self.fsync != "none")
+                logger.info(f"Backup export: {self.rows} rows written under {self.root}")
+        except Exception as e:
+            logger.error(f"Backup export close failed: {e}")
+
+# ----------------- Sharded Crawl -----------------
+def shard_pages(max_pages, workers, worker_id):
+    """Interleaved page shard for a worker, so every worker starts near the head"""
+    return range(worker_id + 1, max_pages + 1, workers)
+
+def crawl_worker(worker_id, workers, max_pages, out_queue, stop_event, skip_pages=frozenset()):
+    """Worker process: fetch and extract its shard of pages and stream rows to the coordinator"""
+    global CHROME_PROFILE_DIR
+    if CHROME_PROFILE_DIR:
+        CHROME_PROFILE_DIR = f"{CHROME_PROFILE_DIR}-w{worker_id}"
+    # The configured rate is for the whole crawl, so each worker gets its share
+    scheduler.limiter = HostRateLimiter(REQUEST_RATE / workers, max(1, REQUEST_BURST // workers))
+    
+    fetcher = None
+    try:
+        fetcher = create_fetcher()
+        if not authenticate(fetcher):
+            logger.warning(f"Worker {worker_id}: login failed - continuing with limited access")
+        
+        def pages():
+            for page in shard_pages(max_pages, workers, worker_id):
+                if stop_event.is_set():
+                    return
+                if page not in skip_pages:
+                    yield page
+        
+        def handle_page(page, page_source):
+            rows = extract_batch(page_source, page, {}) if page_source is not None else []
+            out_queue.put(("page", worker_id, page, rows))
+        
+        asyncio.run(crawl_pages(fetcher, pages(), handle_page))
+    except Exception as e:
+        logger.error(f"Worker {worker_id} failed: {e}")
+        stats.error()
+    finally:
+        if fetcher:
+            fetcher.close()
+        out_queue.put(("done", worker_id, stats.snapshot()))
+
+def run_sharded_crawl(workers, process_rows, tracker):
+    """Run `workers` crawl processes; this process owns dedupe, analytics and sinks"""
+    logger.info(f"Starting sharded crawl with {workers} worker processes")
+    ctx = multiprocessing.get_context("spawn")
+    out_queue = ctx.Queue(maxsize=workers)
+    stop_event = ctx.Event()
+    skip_pages = frozenset(tracker.done_pages)
+    procs = [ctx.Process(target=crawl_worker, args=(i, workers, MAX_PAGES, out_queue, stop_event, skip_pages),
+                         name=f"crawl-worker-{i}", daemon=True)
+             for i in range(workers)]
+    for proc in procs:
+        proc.start()
+    
+    running = workers
+    try:
+        while running:
+            try:
+                message = out_queue.get(timeout=5)
+            except queue.Empty:
+                if not any(proc.is_alive() for proc in procs):
+                    logger.error("All crawl workers exited without reporting")
+                    break
+                continue
+            
+            if message[0] == "page":
+                _, worker_id, page, rows = message
+                if rows:
+                    stats.first_page()
+                try:
+                    process_rows(page, rows)
+                except Exception as e:
+                    logger.error(f"Page {page} processing failed: {e}")
+                    stats.error()
+                if tracker.stop_requested and not stop_event.is_set():
+                    stop_event.set()
+            else:
+                running -= 1
+                stats.merge(message[2])
+    finally:
+        stop_event.set()
+        for proc in procs:
+            proc.join(timeout=30)
+            if proc.is_alive():
+                proc.terminate()
+
+# ----------------- Main Scraping Logic -----------------
+def scrape_batch(fetcher, page_num, profiles_data):
+    """Scrape a single page with detailed logging"""
+    url = START_URL_TEMPLATE.format(page=page_num)
+    logger.info(f"Scraping page {page_num}: {url}")
+    
+    page_source = fetcher.fetch_page(page_num)
+    if page_source is None:
+        return []
+    return extract_batch(page_source, page_num, profiles_data)
+
+def extract_batch(page_source, page_num, profiles_data):
+    """Extract every post from a fetched page's HTML"""
+    start = time.monotonic()
+    try:
+        batch_data, article_count = _extract_batch(page_source, page_num, profiles_data)
+    finally:
+        elapsed = time.monotonic() - start
+        stats.observe("extract", elapsed)
+    stats.page_record(page_num, articles=article_count, posts=len(batch_data), extract=round(elapsed, 3))
+    return batch_data
+
+def _extract_batch(page_source, page_num, profiles_data):
+    # Parse the page snapshot once and extract every article locally
+    root = parse_html(page_source)
+    articles = find_articles(root)
     if not articles:
         logger.warning(f"No articles found on page {page_num}")
-        logger.info(f"Current URL: {driver.current_url}")
-        logger.info(f"Page title: {driver.title}")
         
         # Try alternative selectors
-        all_articles = driver.find_elements(By.CSS_SELECTOR, "article")
+        all_articles = root.find_all("article")
         logger.info(f"Found {len(all_articles)} total article elements")
         
         # Log page source info for debugging
-        page_source_snippet = driver.page_source[:500] if driver.page_source else "No page source"
+        page_source_snippet = page_source[:500] if page_source else "No page source"
         logger.info(f"Page source snippet: {page_source_snippet}")
         
-        return []
+        return [], 0
     
     logger.info(f"Found {len(articles)} articles on page {page_num}")
     
@@ -672,123 +3478,415 @@ def scrape_batch(driver, page_num, profiles_data):
             
             if idx % 5 == 0:  # Progress logging
                 logger.info(f"Processed {idx}/{len(articles)} posts on page {page_num}")
-            
-            human_delay()
         except Exception as e:
             logger.error(f"Error processing article {idx}: {e}")
             stats.error()
     
     logger.info(f"Page {page_num} complete: {len(batch_data)} valid posts extracted from {len(articles)} articles")
-    return batch_data
+    return batch_data, len(articles)
 
-def run_scraper():
-    """Main scraper function"""
+def open_sheet_state():
+    """Connect to Sheets and load the layout, profiles and post store (None if Sheets is unavailable)
+    
+    A partitioned layout that cannot be set up also returns None: the main tab may
+    already be the view, so rows must never fall back to being inserted there.
+    """
+    worksheet = connect_google_sheet()
+    if not worksheet:
+        logger.error("Cannot proceed without Google Sheets access")
+        return None
+    
+    # Partitioned layout: rows go to dated tabs, the main tab becomes a view
+    layout = None
+    if SHEETS_LAYOUT == "partitioned":
+        try:
+            layout = SheetLayout(worksheet)
+            worksheet = layout.prepare()
+        except Exception as e:
+            logger.error(f"Partitioned layout setup failed - skipping Google Sheets this run: {e}")
+            return None
+    
+    # Load profiles and the local post store (dedupe index)
+    profiles_data = load_profiles_data(worksheet)
+    existing_posts = open_post_store(worksheet, layout)
+    return worksheet, layout, profiles_data, existing_posts
+
+def merge_run_analytics(worksheet, graph=GRAPH_ANALYTICS):
+    """Merge the analytics gathered since the last merge into the local history and push changed rows
+    
+    graph=True also rebuilds the interaction graph tabs.
+    """
+    global analytics_data
+    analytics_store = AnalyticsStore()
+    try:
+        touched = analytics_store.merge(analytics_data)
+        analytics_data = AnalyticsModel()
+        update_analytics_sheet(worksheet, analytics_store, touched)
+        if graph:
+            update_graph_sheets(worksheet, analytics_store)
+    finally:
+        analytics_store.close()
+    return len(touched)
+
+class PagePipeline:
+    """Per-page handling shared by one-shot runs and the daemon
+    
+    Each page's rows update the dedupe bookkeeping, go to the backup export,
+    profile enrichment, comment threads and the Sheets sink, and are checkpointed
+    in the journal.
+    """
+
+    def __init__(self, store, profiles, tracker, exporter, sink, enricher=None, journal=None, threads=None):
+        self.store = store
+        self.profiles = profiles
+        self.tracker = tracker
+        self.exporter = exporter
+        self.sink = sink
+        self.enricher = enricher
+        self.journal = journal
+        self.threads = threads
+
+    def handle_page(self, page, page_source):
+        logger.info(f"Processing page {page}/{MAX_PAGES}")
+        batch_data = extract_batch(page_source, page, self.profiles) if page_source is not None else []
+        self.process_rows(page, batch_data)
+
+    def process_rows(self, page, batch_data):
+        # Posts first stored under the old text-hash key move to their post ID on sight
+        migrated = self.store.adopt_legacy_keys(batch_data)
+        if migrated:
+            logger.info(f"Page {page}: {migrated} stored posts re-keyed to post IDs")
+        self.tracker.record_page(page, [post_key(data) for data in batch_data])
+        self.sink.tick()
+        
+        if not batch_data:
+            logger.warning(f"No data extracted from page {page} - this might indicate a problem")
+            return
+        
+        logger.info(f"Successfully extracted {len(batch_data)} posts from page {page}")
+        self.exporter.write_page(batch_data)
+        
+        # Look up unknown authors in the background
+        if self.enricher:
+            self.enricher.submit_rows(batch_data)
+        
+        # Full comment threads must be in place before the sink records analytics
+        if self.threads:
+            stats.page_record(page, threads=self.threads.enrich_rows(page, batch_data))
+        
+        # Queue new posts; the sink writes them in large batches
+        new_count = self.sink.add(batch_data)
+        stats.page_record(page, new=new_count)
+        logger.info(f"Page {page}: {new_count} new posts queued for Google Sheets")
+        if self.journal:
+            self.journal.page(page, batch_data, self.tracker.page_all_seen.get(page, False))
+
+def run_scraper(resume=False):
+    """Main scraper function; resume=True replays the journal of an interrupted run"""
     logger.info("====== DamaDam Scraper Started ======")
     logger.info(f"Configuration: {MAX_PAGES} pages, {BATCH_SIZE} batch size")
     logger.info(f"Target URL template: {START_URL_TEMPLATE}")
+    logger.info(f"Fetch mode: {FETCH_MODE}")
     logger.info(f"Username configured: {'Yes' if USERNAME else 'No'}")
     logger.info(f"Password configured: {'Yes' if PASSWORD else 'No'}")
     
     # Reset analytics for this run
     global analytics_data
-    analytics_data.clear()
-    analytics_data = defaultdict(lambda: {
-        'total_posts': 0,
-        'total_comments': 0,
-        'commented_on': set(),
-        'commenters': defaultdict(int),
-        'posts_links': [],
-        'gender': '',
-        'city': '',
-        'daily_activity': defaultdict(int)
-    })
-    
-    # Connect to Google Sheets
-    worksheet = connect_google_sheet()
-    if not worksheet:
-        logger.error("Cannot proceed without Google Sheets access")
-        return
+    analytics_data = AnalyticsModel()
     
-    # Load profiles and existing posts
-    profiles_data = load_profiles_data(worksheet)
-    existing_posts = get_existing_posts_sheets(worksheet)
+    sheet_state = open_sheet_state()
+    if sheet_state is None:
+        return
+    worksheet, layout, profiles_data, existing_posts = sheet_state
     
-    driver = None
+    fetcher = None
+    journal = RunJournal()
     try:
-        # Setup browser and login
-        logger.info("Initializing Chrome driver...")
-        driver = setup_driver()
-        
-        logger.info("Attempting login to DamaDam...")
-        if not login(driver):
-            logger.warning("Login failed - continuing with limited access")
+        # Setup fetch backend and login
+        if WORKERS > 1:
+            # Workers bring their own fetchers; this one only serves comment threads and enrichment
+            fetcher = LazyFetcher()
         else:
-            logger.info("Login successful - proceeding with authenticated scraping")
+            logger.info(f"Initializing {FETCH_MODE} fetch backend...")
+            fetcher = create_fetcher()
+            
+            logger.info("Attempting login to DamaDam...")
+            if not authenticate(fetcher):
+                logger.warning("Login failed - continuing with limited access")
+            else:
+                logger.info("Login successful - proceeding with authenticated scraping")
         
-        all_scraped_data = []
-        total_new = 0
-        total_updated = 0
+        tracker = IncrementalTracker(existing_posts)
+        if FULL_CRAWL:
+            logger.info("FULL_CRAWL set - crawling all pages")
         
-        # Process each page
-        for page in range(1, MAX_PAGES + 1):
+        # Checkpoint journal: pick up an interrupted run, or start a fresh one
+        resume_state = RunJournal.load() if resume else None
+        if resume and resume_state is None:
+            logger.info("Nothing to resume - starting a fresh run")
+        elif not resume and os.path.exists(JOURNAL_FILE):
+            logger.warning("Previous run was interrupted; its journal is discarded (use --resume to replay it)")
+        journal.start(resume=resume_state is not None)
+        
+        def replay_journal(state, sink):
+            # Rows written before the crash still need analytics unless a merge already
+            # covered them; the rest go back through the sink, which dedupes them
+            replayed = set()
+            for page in sorted(state["pages"]):
+                rows = state["pages"][page]["rows"]
+                tracker.restore_page(page, [post_key(data) for data in rows], state["pages"][page]["all_seen"])
+                for data in rows:
+                    key = post_key(data)
+                    if key in state["flushed"] and key not in state["merged"] and key not in replayed:
+                        record_post_analytics(data)
+                    replayed.add(key)
+                sink.add(rows)
+            logger.info(f"Resumed interrupted run from {state['started']}: {len(state['pages'])} pages done, "
+                        f"{len(replayed)} posts replayed, {len(sink.pending)} still to write")
+        
+        # Fetch pages concurrently; each page is extracted and saved as it arrives
+        threads = CommentThreads(fetcher, existing_posts, worksheet) if COMMENT_THREADS else None
+        with StreamingExporter() as exporter, SheetsSink(worksheet, existing_posts, profiles_data,
+                                                         layout=layout, journal=journal) as sink:
+            enricher = None
+            if PROFILE_ENRICH_LIMIT > 0:
+                enricher = ProfileEnricher(fetcher, profiles_data, worksheet, sink)
+            pipeline = PagePipeline(existing_posts, profiles_data, tracker, exporter, sink, enricher, journal,
+                                    threads)
+            if resume_state is not None:
+                replay_journal(resume_state, sink)
             try:
-                logger.info(f"Starting to scrape page {page}/{MAX_PAGES}")
-                batch_data = scrape_batch(driver, page, profiles_data)
-                
-                if not batch_data:
-                    logger.warning(f"No data extracted from page {page} - this might indicate a problem")
-                    continue
-                
-                logger.info(f"Successfully extracted {len(batch_data)} posts from page {page}")
-                all_scraped_data.extend(batch_data)
-                
-                # Count new posts
-                new_count = 0
-                for data in batch_data:
-                    text = data.get("D_TEXT-P", "")
-                    if text and text_hash(text) not in existing_posts:
-                        new_count += 1
-                
-                logger.info(f"Page {page}: {new_count} new posts identified")
-                
-                # Save batch to Google Sheets
-                logger.info(f"Saving {len(batch_data)} posts to Google Sheets...")
-                success = update_batch_in_sheets(worksheet, batch_data, existing_posts)
-                if success:
-                    stats.add_posts(new_count, 0)  # For simplicity, treating all as new
-                    total_new += new_count
-                    logger.info(f"Page {page}: {new_count} new posts saved successfully")
+                if WORKERS > 1:
+                    run_sharded_crawl(WORKERS, pipeline.process_rows, tracker)
                 else:
-                    logger.error(f"Failed to save data for page {page}")
-                
-                human_delay()
-                
-            except Exception as e:
-                logger.error(f"Page {page} processing failed: {e}")
-                stats.error()
+                    asyncio.run(crawl_pages(fetcher, tracker.pages(MAX_PAGES), pipeline.handle_page))
+            finally:
+                # Let enrichment finish so the final flush can fill in profiles
+                if enricher:
+                    enricher.close()
+                if threads:
+                    threads.close()
+        stats.total_pages = len(tracker.page_keys)
         
-        # Update analytics
-        stats.analytics_users = len(analytics_data)
-        update_analytics_sheet(worksheet)
-        
-        # Save CSV backup
-        if all_scraped_data:
-            export_csv(all_scraped_data)
+        # Merge this run's analytics into the local history and push changed rows
+        stats.analytics_users = merge_run_analytics(worksheet)
+        journal.merged()
+        if sink.pending:
+            logger.warning(f"{len(sink.pending)} rows were not written - keeping the journal for --resume")
+        else:
+            journal.complete()
         
         # Final summary
         duration = stats.duration()
         logger.info("====== Scraping Complete ======")
-        logger.info(f"Results: {total_new} new posts, {stats.analytics_users} users analyzed")
+        logger.info(f"Results: {stats.posts_new} new posts, {stats.analytics_users} users analyzed")
+        logger.info(f"Sheets writes: {sink.flushes} batched flushes, {stats.api_calls} API calls")
+        logger.info(f"Pages crawled: {stats.total_pages}/{MAX_PAGES}")
         logger.info(f"Duration: {str(duration).split('.')[0]}")
+        if stats.first_page_seconds is not None:
+            startup = (f" (driver startup {stats.driver_startup_seconds:.1f}s)"
+                       if stats.driver_startup_seconds is not None else "")
+            logger.info(f"Time to first page: {stats.first_page_seconds:.1f}s{startup}")
         logger.info(f"Success rate: {stats.success_rate():.1f}%")
         logger.info(f"Speed: {stats.posts_per_min():.1f} posts/min")
+        logger.info(f"Requests: {stats.navigations} navigations, "
+                    f"{stats.throttle_seconds:.1f}s throttled vs {stats.navigation_seconds:.1f}s fetching "
+                    f"({stats.throttle_share():.0f}% of request time spent throttled)")
+        logger.info("Phases: " + ", ".join(
+            f"{phase} {hist.total:.1f}s/{hist.count}" for phase, hist in stats.phases.items() if hist.count))
         
     except Exception as e:
         logger.error(f"Scraping failed: {e}")
     finally:
-        if driver:
-            driver.quit()
-            logger.info("Browser closed")
+        if fetcher:
+            fetcher.close()
+        journal.close()
+        existing_posts.close()
+        profiles_data.close()
+        write_run_report()
+
+# ----------------- Daemon Mode -----------------
+class AdaptivePoller:
+    """Poll interval that follows the observed new-post rate
+    
+    Aims for about `target` new posts per poll: busy periods poll often, quiet
+    ones back off geometrically, always within [min_interval, max_interval].
+    """
+
+    def __init__(self, min_interval=DAEMON_MIN_INTERVAL, max_interval=DAEMON_MAX_INTERVAL,
+                 target=DAEMON_TARGET_NEW, smoothing=0.5):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.target = target
+        self.smoothing = smoothing
+        self.rate = None
+        self.interval = min_interval
+
+    def update(self, new_posts, elapsed):
+        """Fold in one poll's result (new posts over `elapsed` seconds); returns the next interval"""
+        observed = new_posts / max(elapsed, 1e-6)
+        if self.rate is None:
+            self.rate = observed
+        else:
+            self.rate = self.smoothing * observed + (1 - self.smoothing) * self.rate
+        if new_posts == 0:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        else:
+            self.interval = self.target / self.rate if self.rate > 0 else self.max_interval
+        self.interval = max(self.min_interval, min(self.max_interval, self.interval))
+        return self.interval
+
+class DaemonStatus:
+    """Health/status file for the daemon, rewritten atomically on every state change"""
+
+    def __init__(self, path=DAEMON_STATUS_FILE):
+        self.path = path
+        self.state = {
+            "pid": os.getpid(),
+            "state": "starting",
+            "started": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "cycles": 0,
+            "posts_new_total": 0,
+            "errors_total": 0,
+        }
+
+    def update(self, **fields):
+        self.state.update(fields)
+        self.state["heartbeat"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            write_atomic(self.path, json.dumps(self.state, indent=2))
+        except Exception as e:
+            logger.warning(f"Could not write daemon status: {e}")
+
+def run_daemon():
+    """Resident mode: keep the session, Sheets client and dedupe index warm and poll adaptively"""
+    logger.info("====== DamaDam Scraper Daemon Started ======")
+    stop = threading.Event()
+    
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum} - finishing the current cycle and shutting down")
+        stop.set()
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    
+    status = DaemonStatus()
+    status.update()
+    sheet_state = open_sheet_state()
+    if sheet_state is None:
+        status.update(state="failed", error="Google Sheets unavailable")
+        return
+    worksheet, layout, profiles_data, existing_posts = sheet_state
+    if WORKERS > 1:
+        logger.info("Daemon mode polls with a single fetcher; WORKERS is ignored")
+    
+    global analytics_data
+    analytics_data = AnalyticsModel()
+    poller = AdaptivePoller()
+    fetcher = None
+    try:
+        fetcher = create_fetcher()
+        if not authenticate(fetcher):
+            logger.warning("Login failed - continuing with limited access")
+        
+        def until_stopped(pages):
+            for page in pages:
+                if stop.is_set():
+                    return
+                yield page
+        
+        with StreamingExporter() as exporter, SheetsSink(worksheet, existing_posts, profiles_data,
+                                                         layout=layout) as sink:
+            last_poll = None
+            last_graph = None
+            while not stop.is_set():
+                stats.reset()
+                poll_started = time.monotonic()
+                status.update(state="polling")
+                # Head first: a fully known page 1 ends the cycle, a backlog drains deeper pages
+                tracker = IncrementalTracker(existing_posts, stop_after=1)
+                enricher = (ProfileEnricher(fetcher, profiles_data, worksheet, sink)
+                            if PROFILE_ENRICH_LIMIT > 0 else None)
+                threads = CommentThreads(fetcher, existing_posts, worksheet) if COMMENT_THREADS else None
+                pipeline = PagePipeline(existing_posts, profiles_data, tracker, exporter, sink, enricher,
+                                        threads=threads)
+                try:
+                    try:
+                        # Page 1 alone, so a quiet head costs a single request
+                        asyncio.run(crawl_pages(fetcher, until_stopped([1]), pipeline.handle_page))
+                        if not tracker.stop_requested:
+                            deeper = (page for page in tracker.pages(MAX_PAGES) if page > 1)
+                            asyncio.run(crawl_pages(fetcher, until_stopped(deeper), pipeline.handle_page))
+                    finally:
+                        if enricher:
+                            enricher.close()
+                        if threads:
+                            threads.close()
+                    sink.flush()
+                    stats.total_pages = len(tracker.page_keys)
+                    if len(analytics_data):
+                        graph_due = (GRAPH_ANALYTICS and (last_graph is None or
+                                     time.monotonic() - last_graph >= GRAPH_REFRESH_MINUTES * 60))
+                        stats.analytics_users = merge_run_analytics(worksheet, graph=graph_due)
+                        if graph_due:
+                            last_graph = time.monotonic()
+                    # An empty head usually means the session was dropped
+                    if not tracker.page_keys.get(1) and not stop.is_set():
+                        logger.warning("No posts on page 1 - re-authenticating")
+                        clear_session_cookies()
+                        authenticate(fetcher)
+                except Exception as e:
+                    logger.error(f"Poll cycle failed: {e}")
+                    stats.error()
+                
+                elapsed = poll_started - last_poll if last_poll is not None else poller.interval
+                last_poll = poll_started
+                interval = poller.update(stats.posts_new, elapsed)
+                write_run_report()
+                logger.info(f"Cycle done: {stats.total_pages} pages, {stats.posts_new} new posts, "
+                            f"{stats.errors} errors - next poll in {interval:.0f}s")
+                status.update(
+                    state="sleeping",
+                    cycles=status.state["cycles"] + 1,
+                    last_cycle=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    last_cycle_seconds=round(time.monotonic() - poll_started, 2),
+                    last_pages=stats.total_pages,
+                    last_posts_new=stats.posts_new,
+                    posts_new_total=status.state["posts_new_total"] + stats.posts_new,
+                    errors_total=status.state["errors_total"] + stats.errors,
+                    new_posts_per_min=round((poller.rate or 0) * 60, 2),
+                    interval_seconds=round(interval, 1),
+                    next_poll=(datetime.now() + timedelta(seconds=interval)).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+                stop.wait(interval)
+            status.update(state="stopping")
+    except Exception as e:
+        logger.error(f"Daemon failed: {e}")
+        status.update(state="failed", error=str(e))
+    finally:
+        try:
+            if len(analytics_data):
+                merge_run_analytics(worksheet)
+        except Exception as e:
+            logger.error(f"Final analytics merge failed: {e}")
+        if fetcher:
+            fetcher.close()
+        existing_posts.close()
+        profiles_data.close()
+        if status.state["state"] != "failed":
+            status.update(state="stopped")
+        logger.info("====== DamaDam Scraper Daemon Stopped ======")
 
 if __name__ == "__main__":
-    run_scraper()
+    parser = argparse.ArgumentParser(description="DamaDam fresh-list scraper")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true",
+                      help="replay the checkpoint journal of an interrupted run and skip its completed pages")
+    mode.add_argument("--daemon", action="store_true",
+                      help="stay resident and poll the fresh list adaptively until SIGTERM/SIGINT")
+    args = parser.parse_args()
+    warn_legacy_settings()
+    if args.daemon:
+        run_daemon()
+    else:
+        run_scraper(resume=args.resume)